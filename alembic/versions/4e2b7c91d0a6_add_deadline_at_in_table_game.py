@@ -0,0 +1,28 @@
+"""add deadline_at in table game
+
+Revision ID: 4e2b7c91d0a6
+Revises: 713c1544b8c3
+Create Date: 2026-10-19 12:31:27.540918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e2b7c91d0a6'
+down_revision: Union[str, None] = '713c1544b8c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('games', sa.Column('deadline_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('games', 'deadline_at')
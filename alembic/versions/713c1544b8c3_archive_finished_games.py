@@ -0,0 +1,100 @@
+"""archive finished games
+
+Revision ID: 713c1544b8c3
+Revises: 9fc91173e110
+Create Date: 2026-10-19 11:48:03.117264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '713c1544b8c3'
+down_revision: Union[str, None] = '9fc91173e110'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('games', sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE games SET finished_at = now() WHERE state = 'GAME_FINISHED'")
+    op.create_index(
+        'ix_games_finished_at',
+        'games',
+        ['finished_at'],
+        unique=False,
+        postgresql_where=sa.text("state = 'GAME_FINISHED'"),
+    )
+
+    # Архив секционирован по месяцам, секции создает GameArchiver
+    op.execute(
+        """
+        CREATE TABLE games_archive (
+            game_id INTEGER NOT NULL,
+            chat_id BIGINT NOT NULL,
+            state gamestate NOT NULL,
+            question_id INTEGER NOT NULL,
+            revealed_letters VARCHAR NOT NULL,
+            current_player_id INTEGER,
+            bonus_points INTEGER NOT NULL,
+            participants_count INTEGER NOT NULL,
+            finished_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            PRIMARY KEY (game_id, finished_at)
+        ) PARTITION BY RANGE (finished_at)
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE game_participants_archive (
+            participant_id INTEGER NOT NULL,
+            game_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            state gameparticipantstate NOT NULL,
+            turn_order INTEGER NOT NULL,
+            points INTEGER NOT NULL,
+            finished_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            PRIMARY KEY (participant_id, finished_at)
+        ) PARTITION BY RANGE (finished_at)
+        """
+    )
+    op.create_index('ix_games_archive_chat_id', 'games_archive', ['chat_id'])
+    op.create_index('ix_game_participants_archive_game_id', 'game_participants_archive', ['game_id'])
+    op.create_index('ix_game_participants_archive_user_id', 'game_participants_archive', ['user_id'])
+
+    # Запросы статистики читают горячие таблицы и архив через эти view
+    op.execute(
+        """
+        CREATE VIEW games_history AS
+        SELECT game_id, chat_id, state, question_id, revealed_letters,
+               current_player_id, bonus_points, participants_count, finished_at
+        FROM games
+        UNION ALL
+        SELECT game_id, chat_id, state, question_id, revealed_letters,
+               current_player_id, bonus_points, participants_count, finished_at
+        FROM games_archive
+        """
+    )
+    op.execute(
+        """
+        CREATE VIEW game_participants_history AS
+        SELECT participant_id, game_id, user_id, state, turn_order, points
+        FROM game_participants
+        UNION ALL
+        SELECT participant_id, game_id, user_id, state, turn_order, points
+        FROM game_participants_archive
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP VIEW game_participants_history")
+    op.execute("DROP VIEW games_history")
+    op.drop_table('game_participants_archive')
+    op.drop_table('games_archive')
+    op.drop_index('ix_games_finished_at', table_name='games')
+    op.drop_column('games', 'finished_at')
@@ -0,0 +1,105 @@
+"""add live game indexes
+
+Revision ID: 9fc91173e110
+Revises: d5ab7dfc803d
+Create Date: 2026-10-19 11:02:17.540932
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9fc91173e110'
+down_revision: Union[str, None] = 'd5ab7dfc803d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LIVE_GAME_INDEXES = ('ix_games_live_chat_id', 'ix_game_participants_game_id_state')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Уникальный индекс не построится, пока в чате несколько живых игр:
+    # оставляем самую новую, остальные завершаем вместе с их игроками
+    op.execute(
+        """
+        WITH duplicates AS (
+            UPDATE games SET state = 'GAME_FINISHED'
+            WHERE state <> 'GAME_FINISHED'
+              AND game_id NOT IN (
+                  SELECT max(game_id) FROM games
+                  WHERE state <> 'GAME_FINISHED'
+                  GROUP BY chat_id
+              )
+            RETURNING game_id
+        )
+        UPDATE game_participants SET state = 'LEFT'
+        WHERE game_id IN (SELECT game_id FROM duplicates)
+          AND state IN ('ACTIVE_TURN', 'WAITING')
+        """
+    )
+    # CONCURRENTLY не блокирует запись в таблицы, но не работает в транзакции
+    with op.get_context().autocommit_block():
+        # Прерванная сборка CONCURRENTLY оставляет INVALID индекс с тем же
+        # именем, из-за которого повторная миграция падает
+        invalid_indexes = op.get_bind().execute(
+            sa.text(
+                """
+                SELECT c.relname FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE NOT i.indisvalid AND c.relname = ANY(:names)
+                """
+            ),
+            {'names': list(LIVE_GAME_INDEXES)},
+        ).scalars().all()
+        for index_name in invalid_indexes:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
+        op.create_index(
+            'ix_games_live_chat_id',
+            'games',
+            ['chat_id'],
+            unique=True,
+            postgresql_where=sa.text("state <> 'GAME_FINISHED'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_game_participants_game_id_state',
+            'game_participants',
+            ['game_id', 'state'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_game_participants_game_id',
+            table_name='game_participants',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_game_participants_game_id',
+            'game_participants',
+            ['game_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_game_participants_game_id_state',
+            table_name='game_participants',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_games_live_chat_id',
+            table_name='games',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,41 @@
+"""add deadline index
+
+Revision ID: a83f0d5c2e71
+Revises: 4e2b7c91d0a6
+Create Date: 2026-10-19 13:05:44.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83f0d5c2e71'
+down_revision: Union[str, None] = '4e2b7c91d0a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_games_deadline_at',
+            'games',
+            ['deadline_at'],
+            unique=False,
+            postgresql_where=sa.text("deadline_at IS NOT NULL"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_games_deadline_at',
+            table_name='games',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,43 @@
+"""create table game_events
+
+Revision ID: c4f1e9a27b36
+Revises: a83f0d5c2e71
+Create Date: 2026-10-19 15:12:31.574210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f1e9a27b36'
+down_revision: Union[str, None] = 'a83f0d5c2e71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('game_events',
+    sa.Column('event_id', sa.BigInteger(), sa.Identity(), nullable=False),
+    sa.Column('game_id', sa.Integer(), nullable=False),
+    sa.Column('chat_id', sa.BigInteger(), nullable=False),
+    sa.Column('participant_id', sa.Integer(), nullable=True),
+    sa.Column('event_type', sa.Enum('JOIN', 'SPIN', 'GUESS_LETTER', 'GUESS_WORD', 'TIMEOUT', 'LEAVE', 'WIN', name='gameeventtype'), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+    op.create_index('ix_game_events_game_id_event_id', 'game_events', ['game_id', 'event_id'], unique=False)
+    op.create_index('ix_game_events_created_at', 'game_events', ['created_at'], unique=False, postgresql_using='brin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_game_events_created_at', table_name='game_events', postgresql_using='brin')
+    op.drop_index('ix_game_events_game_id_event_id', table_name='game_events')
+    op.drop_table('game_events')
+    op.execute('DROP TYPE gameeventtype')
@@ -0,0 +1,39 @@
+"""add participants_count in table game
+
+Revision ID: d5ab7dfc803d
+Revises: 349bf86d59a2
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5ab7dfc803d'
+down_revision: Union[str, None] = '349bf86d59a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('games', sa.Column('participants_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        """
+        UPDATE games SET participants_count = p.count
+        FROM (
+            SELECT game_id, count(*) AS count
+            FROM game_participants
+            GROUP BY game_id
+        ) AS p
+        WHERE games.game_id = p.game_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('games', 'participants_count')
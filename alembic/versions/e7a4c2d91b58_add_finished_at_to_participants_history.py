@@ -0,0 +1,51 @@
+"""add finished_at to game_participants_history
+
+Revision ID: e7a4c2d91b58
+Revises: c4f1e9a27b36
+Create Date: 2026-10-19 18:02:11.318540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a4c2d91b58'
+down_revision: Union[str, None] = 'c4f1e9a27b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Время завершения, как в games_history: у горячих участников берется
+    # из игры, в архиве хранится в строке участника
+    op.execute(
+        """
+        CREATE OR REPLACE VIEW game_participants_history AS
+        SELECT p.participant_id, p.game_id, p.user_id, p.state,
+               p.turn_order, p.points, g.finished_at
+        FROM game_participants AS p
+        JOIN games AS g USING (game_id)
+        UNION ALL
+        SELECT participant_id, game_id, user_id, state,
+               turn_order, points, finished_at
+        FROM game_participants_archive
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP VIEW game_participants_history")
+    op.execute(
+        """
+        CREATE VIEW game_participants_history AS
+        SELECT participant_id, game_id, user_id, state, turn_order, points
+        FROM game_participants
+        UNION ALL
+        SELECT participant_id, game_id, user_id, state, turn_order, points
+        FROM game_participants_archive
+        """
+    )
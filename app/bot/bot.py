@@ -4,6 +4,7 @@ import logging
 
 from aio_pika.abc import AbstractIncomingMessage
 
+from app.poller.poller import Poller
 from app.poller.schemes import Update
 from app.store.store import Store
 from app.web.config import Config
@@ -17,34 +18,62 @@ class Bot:
         self.queue_id = queue_id
 
     async def run_bot(self) -> None:
-        self.store.bot_metrics.start_metrics_server()
+        await self.store.bot_metrics.connect()
+        await self.store.tracer.connect()
         await self.store.broker.connect()
         await self.store.tg_api.connect()
         await self.store.database.connect()
         await self.store.game_accessor.connect()
+        await self.store.game_event_log.connect()
+        await self.store.question_cache.connect()
+        await self.store.timing_wheel.connect()
+        await self.store.fsm_manager.connect()
+        await self.store.fsm_manager.restore_games(self.owns_chat)
+        self.store.fsm_manager.watch_deadlines(self.owns_chat)
         await self.consume_updates()
         logger.info("Bot queue_id=%s started successfully", self.queue_id)
 
     async def stop_bot(self) -> None:
+        await self.store.fsm_manager.disconnect()
+        await self.store.timing_wheel.disconnect()
+        await self.store.game_event_log.disconnect()
         await self.store.database.disconnect()
         await self.store.broker.disconnect()
         await self.store.tg_api.disconnect()
-        self.store.bot_metrics.stop_metrics_server()
+        await self.store.tracer.disconnect()
+        await self.store.bot_metrics.disconnect()
         logger.info("Bot queue_id=%s stopped successfully", self.queue_id)
 
+    def owns_chat(self, chat_id: int) -> bool:
+        # TODO: Та же очередь, в которую поллер кладет обновления чата
+        queue_name = Poller.calculate_queue_name(
+            chat_id, self.store.config.broker.number_queues
+        )
+        return queue_name == f"update_queue_{self.queue_id}"
+
     async def consume_updates(self) -> None:
         channel = self.store.broker.channel
         queue = await channel.declare_queue(
             f"update_queue_{self.queue_id}", durable=True
         )
-        await queue.consume(callback=self.process_handle_updates)
+        self.store.broker.consumer_tag = await queue.consume(
+            callback=self.process_handle_updates
+        )
         await asyncio.Future()
 
     async def process_handle_updates(
         self, message: AbstractIncomingMessage
     ) -> None:
-        body = Update(**json.loads(message.body.decode()))
-        await self.store.bot_manager.handle_updates(body)
+        with self.store.tracer.start_trace(
+            "bot.handle_update",
+            self.store.tracer.extract(message.headers),
+            queue_id=self.queue_id,
+        ) as span:
+            body = Update(**json.loads(message.body.decode()))
+            if span is not None:
+                span.set_attribute("update_id", body.update_id)
+                span.set_attribute("chat_id", body.body.chat_id)
+            await self.store.bot_manager.handle_updates(body)
         await message.ack()
 
 
@@ -1,10 +1,11 @@
 import logging
 from abc import ABC, abstractmethod
 
-from app.game.models import GameParticipantState, GameState
+from app.game.models import GameEventType, GameParticipantState, GameState
+from app.game.snapshot import PlayerSnapshot
 from app.poller.schemes import CallbackQuery, Message
 from app.store.store import Store
-from app.web.exceptions import ParticipantRegistrationError
+from app.web.exceptions import GameCreateError, ParticipantRegistrationError
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +23,20 @@ class BaseHandler(ABC):
         await self.handle(callback)
 
     def save_log(self, callback: CallbackQuery) -> None:
+        if not logger.isEnabledFor(logging.INFO):
+            return
         logger.info(
             "%s: User %s, clicked button %s, in chat_id: %s",
             self.__class__.__name__,
             callback.from_username,
             callback.command,
             callback.chat_id,
+            extra={
+                "chat_id": callback.chat_id,
+                "handler": self.__class__.__name__,
+                "player": callback.from_username,
+                "command": callback.command,
+            },
         )
 
     async def answer_callback(self, callback: CallbackQuery, text: str) -> None:
@@ -51,16 +60,24 @@ class StartHandler(BaseHandler):
                 game.chat_id,
             )
             await self.answer_callback(callback, "Игра восстановлена")
-            await fsm.restore_current_state(game)
+            await fsm.restore_current_state()
         else:
             question = await self.store.game_accessor.get_random_question()
-            game = await self.store.game_accessor.create_game(
-                chat_id=callback.chat_id,
-                question_id=question.question_id,
-                state=GameState.WAITING_FOR_PLAYERS,
-            )
+            self.store.question_cache.put(question)
+            # TODO: Уникальный индекс не даст создать вторую живую игру в чате
+            try:
+                game = await self.store.game_accessor.create_game(
+                    chat_id=callback.chat_id,
+                    question_id=question.question_id,
+                    state=GameState.WAITING_FOR_PLAYERS,
+                )
+            except GameCreateError as e:
+                logger.warning(e)
+                await self.answer_callback(callback, "Игра уже запущена")
+                return
             logger.info("Starting new game in chat_id: %s", game.chat_id)
             fsm = self.store.fsm_manager.set_fsm(callback.chat_id, game.game_id)
+            fsm.init_game(game, question)
             await self.answer_callback(callback, "Старт игры")
             await fsm.set_current_state(GameState.WAITING_FOR_PLAYERS)
 
@@ -78,35 +95,41 @@ class JoinHandler(BaseHandler):
             await self.answer_callback(callback, "Игра на другом этапе")
             return
 
-        # TODO: Добавляем пользователя в таблицу User если его еще там нет
-        user = await self.store.game_accessor.get_user_by_tg_id(
-            callback.from_id
-        )
-        if user is None:
-            user = await self.store.game_accessor.create_user(
-                callback.from_id, callback.from_username
-            )
-        # TODO: Назначаем ему порядковый номер для хода и добавляем в игру
-        player_count = await self.store.game_accessor.get_count_participant(
-            game_id=fsm.game_id
+        # TODO: Добавляем пользователя в таблицу User или обновляем username
+        user_id = await self.store.game_accessor.upsert_user(
+            callback.from_id, callback.from_username
         )
+        # TODO: Добавляем в игру, порядковый номер хода назначается в БД
         try:
-            await self.store.game_accessor.create_game_participant(
-                fsm.game_id, user.user_id, player_count
+            (
+                participant_id,
+                participants_count,
+            ) = await self.store.game_accessor.register_participant(
+                fsm.game_id, user_id
             )
-            await self.answer_callback(
-                callback,
-                f"Игрок @{callback.from_username} присоединился к игре",
-            )
-
-            await fsm.update_current_state()
-
         except ParticipantRegistrationError as e:
             logger.warning(e)
             await self.answer_callback(
                 callback,
                 f"{callback.from_username} - вы уже зарегистрированы",
             )
+            return
+
+        player = PlayerSnapshot(
+            participant_id=participant_id,
+            user_id=user_id,
+            tg_user_id=callback.from_id,
+            username=callback.from_username,
+            turn_order=participants_count - 1,
+        )
+        fsm.game.add_player(player)
+        fsm.record_event(GameEventType.JOIN, player, user_id=user_id)
+        await self.answer_callback(
+            callback,
+            f"Игрок @{callback.from_username} присоединился к игре",
+        )
+
+        await fsm.update_current_state()
 
 
 class LeaveGameHandler(BaseHandler):
@@ -128,15 +151,13 @@ class LeaveGameHandler(BaseHandler):
             return
 
         # TODO: меняем статус на LEFT
-        game = await self.store.game_accessor.get_game_by_game_id(fsm.game_id)
+        player = fsm.game.get_current_player()
         await self.answer_callback(callback, "Вы покинули игру")
         await self.store.tg_api.send_message(
-            fsm.chat_id, f"@{game.current_player.user.username} Покинул игру"
-        )
-        await self.store.game_accessor.update_status_player(
-            game.current_player,
-            GameParticipantState.LEFT,
+            fsm.chat_id, f"@{player.username} Покинул игру"
         )
+        fsm.game.set_player_state(player, GameParticipantState.LEFT)
+        fsm.record_event(GameEventType.LEAVE, player, points=player.points)
         await fsm.set_current_state(GameState.CHECK_WINNER)
 
 
@@ -194,6 +215,11 @@ class TextMessageHandler:
             message.from_username,
             message.text,
             message.chat_id,
+            extra={
+                "chat_id": message.chat_id,
+                "handler": self.__class__.__name__,
+                "player": message.from_username,
+            },
         )
         # TODO: Проверяем есть ли запущенная игра
         fsm = self.store.fsm_manager.get_fsm(message.chat_id)
@@ -6,7 +6,6 @@ from app.bot.bot import setup_bot
 from app.web.config import get_config_path, load_config
 from app.web.logger import setup_logging
 
-setup_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +23,7 @@ async def main() -> None:
     queue_id = args.queue_id
 
     config = load_config(get_config_path())
+    setup_logging(config.logging)
     bot = setup_bot(config, queue_id)
     try:
         await bot.run_bot()
@@ -1,78 +1,252 @@
+import asyncio
 import logging
-import threading
+import time
 from collections.abc import Callable
-from functools import wraps
-from typing import TYPE_CHECKING, Any, TypeVar
-from wsgiref.simple_server import WSGIServer
-
-from prometheus_client import Gauge, start_http_server
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import cache, wraps
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import web
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.metrics import MetricWrapperBase
 
 if TYPE_CHECKING:
-    from app.store.game.fsm_manager import FsmManager
     from app.store.store import Store
 
 logger = logging.getLogger(__name__)
-T = TypeVar("T", bound="FsmManager")
+
+
+@dataclass
+class UpdateQueries:
+    count: int = 0
+
+
+# Метод аксессора, из которого выполняется запрос в БД
+DB_METHOD: ContextVar[str] = ContextVar("db_method", default="unknown")
+# Запросы в БД, выполненные при обработке текущего обновления
+UPDATE_QUERIES: ContextVar[UpdateQueries | None] = ContextVar(
+    "update_queries", default=None
+)
 
 
 class MetricsBot:
     def __init__(self, store: "Store") -> None:
         self.store = store
-        self.port = store.config.metrics.port
-        self.server: WSGIServer | None = None
-        self.t: threading.Thread | None = None
+        self.runner: web.AppRunner | None = None
+        self.loop_lag_task: asyncio.Task | None = None
+        self.loop_lag = 0.0
+        # TODO: Значения считаются по FsmManager в момент сбора метрик
         self.ACTIVE_GAMES = Gauge("app_active_games", "Количество активных игр")
         self.ACTIVE_PLAYERS = Gauge(
             "app_active_players", "Количество активных игроков"
         )
+        self.UPDATE_LATENCY = Histogram(
+            "app_update_seconds",
+            "Время обработки обновления",
+            ["handler", "state"],
+            buckets=(
+                0.001,
+                0.0025,
+                0.005,
+                0.01,
+                0.025,
+                0.05,
+                0.1,
+                0.25,
+                0.5,
+                1,
+            ),
+        )
+        self.UPDATE_LAG = Histogram(
+            "app_update_lag_seconds",
+            "Время от отправки обновления в Telegram до конца обработки",
+            buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 300),
+        )
+        self.TRANSITIONS = Counter(
+            "app_fsm_transitions",
+            "Переходы FSM игр",
+            ["from_state", "to_state"],
+        )
+        self.TIMEOUTS = Counter(
+            "app_fsm_timeouts", "Срабатывания таймеров по состояниям", ["state"]
+        )
+        self.TG_API_LATENCY = Histogram(
+            "app_tg_api_seconds", "Время запросов к Telegram API", ["method"]
+        )
+        self.TG_API_ERRORS = Counter(
+            "app_tg_api_errors", "Ошибки запросов к Telegram API", ["method"]
+        )
+        self.QUESTION_CACHE_HITS = Counter(
+            "app_question_cache_hits", "Попадания в кэш вопросов"
+        )
+        self.QUESTION_CACHE_MISSES = Counter(
+            "app_question_cache_misses", "Промахи кэша вопросов"
+        )
+        self.RESTORE_DURATION = Gauge(
+            "app_restore_seconds", "Время восстановления игр при запуске"
+        )
+        self.RESTORED_GAMES = Gauge(
+            "app_restored_games", "Количество игр, восстановленных при запуске"
+        )
+        self.OVERDUE_GAMES = Counter(
+            "app_overdue_games",
+            "Игры, поднятые из БД по истекшему сроку таймера",
+        )
+        self.RESIDENT_FSMS = Gauge(
+            "app_resident_fsms", "Количество FSM игр в памяти"
+        )
+        self.FSM_EVICTIONS = Counter(
+            "app_fsm_evictions", "Выгрузки FSM игр из памяти", ["reason"]
+        )
+        self.FSM_REHYDRATIONS = Counter(
+            "app_fsm_rehydrations", "Восстановления выгруженных FSM из БД"
+        )
+        self.PENDING_TIMERS = Gauge(
+            "app_pending_timers", "Количество запланированных таймеров"
+        )
+        self.TIMER_LAG = Histogram(
+            "app_timer_lag_seconds",
+            "Запаздывание срабатывания таймера",
+            buckets=(0.01, 0.05, 0.1, 0.15, 0.25, 0.5, 1, 2.5, 5),
+        )
+        self.DB_METHOD_LATENCY = Histogram(
+            "app_db_method_seconds",
+            "Время выполнения методов аксессоров",
+            ["method"],
+        )
+        self.DB_STATEMENT_LATENCY = Histogram(
+            "app_db_statement_seconds",
+            "Время выполнения запросов в БД",
+            ["method", "statement"],
+        )
+        self.DB_ROWS = Histogram(
+            "app_db_rows",
+            "Количество строк, возвращенных запросом",
+            ["method"],
+            buckets=(0, 1, 2, 5, 10, 25, 50, 100, 500, 1000),
+        )
+        self.DB_CHECKOUT_WAIT = Histogram(
+            "app_db_checkout_seconds", "Ожидание соединения из пула"
+        )
+        self.DB_QUERIES_PER_UPDATE = Histogram(
+            "app_db_queries_per_update",
+            "Количество запросов в БД на одно обновление",
+            ["handler", "state"],
+            buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+        )
+        self.CHAT_LOCK_WAIT = Histogram(
+            "app_chat_lock_wait_seconds",
+            "Ожидание блокировки чата",
+            ["source"],
+            buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+        )
+        self.CHAT_LOCK_CONTENDED = Counter(
+            "app_chat_lock_contended",
+            "Захваты блокировки чата, которым пришлось ждать",
+            ["source"],
+        )
+        self.CHAT_LOCKS = Gauge(
+            "app_chat_locks", "Количество чатов с занятой блокировкой"
+        )
+        self.GAME_EVENTS = Counter(
+            "app_game_events", "События игр в журнале", ["event"]
+        )
+        self.PENDING_GAME_EVENTS = Gauge(
+            "app_pending_game_events", "События игр, ожидающие записи в БД"
+        )
+        self.DROPPED_GAME_EVENTS = Counter(
+            "app_dropped_game_events",
+            "События игр, отброшенные при переполнении очереди записи",
+        )
+        self.EVENT_LOOP_LAG = Histogram(
+            "app_event_loop_lag_seconds",
+            "Задержка цикла событий",
+            buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+        )
+        self.STALE_TIMEOUTS = Counter(
+            "app_stale_timeouts",
+            "Срабатывания таймера, отмененного пока ждали блокировку",
+        )
 
-    def start_metrics_server(self) -> None:
-        try:
-            self.server, self.t = start_http_server(self.port, addr="0.0.0.0")
-            logger.info("Metrics server started successfully")
-        except Exception as e:
-            logger.error("Failed to start metrics server: %s", e)
-
-    def stop_metrics_server(self) -> None:
-        self.server.shutdown()
-        self.t.join()
-
-
-def increment_active_games(func: Callable) -> Callable:
-    @wraps(func)
-    def inner(self: T, *args: Any, **kwargs: Any) -> Any:
-        if self.store.bot_metrics.server:
-            self.store.bot_metrics.ACTIVE_GAMES.inc()
-        return func(self, *args, **kwargs)
-
-    return inner
-
-
-def decrement_active_games(func: Callable) -> Callable:
-    @wraps(func)
-    def inner(self: T, *args: Any, **kwargs: Any) -> Any:
-        if self.store.bot_metrics.server:
-            self.store.bot_metrics.ACTIVE_GAMES.dec()
-        return func(self, *args, **kwargs)
-
-    return inner
+    async def connect(self, *args: Any, **kwargs: Any) -> None:
+        config = self.store.config.metrics
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.router.add_get("/healthz", self.handle_healthz)
+        app.router.add_get("/readyz", self.handle_readyz)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, config.host, config.port).start()
+        self.loop_lag_task = asyncio.create_task(self._loop_lag_monitor())
+        logger.info("Metrics server started on port %s", config.port)
+
+    async def disconnect(self, *args: Any, **kwargs: Any) -> None:
+        if self.loop_lag_task is not None:
+            self.loop_lag_task.cancel()
+            self.loop_lag_task = None
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+            logger.info("Metrics server stopped")
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        response = web.Response(body=generate_latest())
+        response.headers["Content-Type"] = CONTENT_TYPE_LATEST
+        return response
+
+    async def handle_healthz(self, request: web.Request) -> web.Response:
+        # TODO: Процесс жив, если цикл событий успел ответить
+        return web.json_response({"status": "ok"})
+
+    async def handle_readyz(self, request: web.Request) -> web.Response:
+        checks = {
+            "broker": self.store.broker.is_consuming,
+            "database": await self.store.database.ping(),
+            "event_loop": self.loop_lag
+            < self.store.config.metrics.max_loop_lag,
+        }
+        ready = all(checks.values())
+        return web.json_response(
+            {"status": "ok" if ready else "unavailable", "checks": checks},
+            status=200 if ready else 503,
+        )
 
+    async def _loop_lag_monitor(self) -> None:
+        # TODO: Насколько позже заказанного просыпается sleep
+        interval = self.store.config.metrics.loop_lag_interval
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lag = max(time.perf_counter() - start - interval, 0)
+            self.EVENT_LOOP_LAG.observe(self.loop_lag)
 
-def increment_active_players(func: Callable) -> Callable:
-    @wraps(func)
-    def inner(self: T, *args: Any, **kwargs: Any) -> Any:
-        if self.store.bot_metrics.server:
-            self.store.bot_metrics.ACTIVE_PLAYERS.inc()
-        return func(self, *args, **kwargs)
 
-    return inner
+@cache
+def labeled(metric: MetricWrapperBase, *labels: str) -> Any:
+    # TODO: labels() на каждый вызов берет блокировку и собирает ключ,
+    #  для меток с ограниченным набором значений дочерние метрики кэшируются
+    return metric.labels(*labels)
 
 
-def decrement_active_players(func: Callable) -> Callable:
+def observe_db_method(func: Callable) -> Callable:
     @wraps(func)
-    def inner(self: T, *args: Any, **kwargs: Any) -> Any:
-        if self.store.bot_metrics.server:
-            self.store.bot_metrics.ACTIVE_PLAYERS.dec()
-        return func(self, *args, **kwargs)
+    async def inner(self: Any, *args: Any, **kwargs: Any) -> Any:
+        token = DB_METHOD.set(func.__qualname__)
+        start = time.perf_counter()
+        try:
+            with self.store.tracer.span(func.__qualname__):
+                return await func(self, *args, **kwargs)
+        finally:
+            labeled(
+                self.store.bot_metrics.DB_METHOD_LATENCY, func.__qualname__
+            ).observe(time.perf_counter() - start)
+            DB_METHOD.reset(token)
 
     return inner
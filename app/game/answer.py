@@ -0,0 +1,66 @@
+from dataclasses import dataclass, field
+
+
+def normalize_letters(text: str) -> str:
+    # TODO: Ё и Е считаются одной буквой
+    return text.upper().replace("Ё", "Е")
+
+
+@dataclass(slots=True)
+class AnswerIndex:
+    answer: str
+    shown: str
+    positions: dict[str, tuple[int, ...]]
+    masked: list[str]
+    remaining: int = 0
+    called: set[str] = field(default_factory=set)
+
+    @classmethod
+    def build(cls, answer: str, revealed_letters: str = "") -> "AnswerIndex":
+        positions: dict[str, list[int]] = {}
+        masked = []
+        for i, (letter, shown) in enumerate(
+            zip(normalize_letters(answer), answer.upper(), strict=True)
+        ):
+            if letter.isalpha():
+                positions.setdefault(letter, []).append(i)
+                masked.append("_")
+            else:
+                masked.append(shown)
+
+        index = cls(
+            answer=normalize_letters(answer),
+            shown=answer.upper(),
+            positions={k: tuple(v) for k, v in positions.items()},
+            masked=masked,
+            remaining=len(positions),
+        )
+        for letter in revealed_letters:
+            index.reveal(letter)
+        return index
+
+    @property
+    def is_guessed(self) -> bool:
+        return self.remaining == 0
+
+    def is_called(self, letter: str) -> bool:
+        return normalize_letters(letter) in self.called
+
+    def reveal(self, letter: str) -> int:
+        # TODO: Открывает все вхождения буквы, возвращает их количество
+        letter = normalize_letters(letter)
+        if letter in self.called:
+            return 0
+        self.called.add(letter)
+        positions = self.positions.get(letter, ())
+        if positions:
+            self.remaining -= 1
+        for i in positions:
+            self.masked[i] = self.shown[i]
+        return len(positions)
+
+    def mask(self) -> str:
+        return " ".join(self.masked)
+
+    def matches(self, word: str) -> bool:
+        return normalize_letters(word) == self.answer
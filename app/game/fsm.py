@@ -1,7 +1,21 @@
 import logging
+import time
 import typing
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
+from functools import partial
 
-from app.game.models import GameModel, GameState
+from app.bot.metrics import labeled
+from app.game.answer import AnswerIndex, normalize_letters
+from app.game.models import (
+    GameEventType,
+    GameModel,
+    GameParticipantModel,
+    GameParticipantState,
+    GameState,
+    QuestionModel,
+)
+from app.game.snapshot import GameSnapshot, PlayerSnapshot
 from app.game.states import (
     BaseFsmState,
     CheckWinnerFsmState,
@@ -12,8 +26,9 @@ from app.game.states import (
     WaitingLetterFsmState,
     WaitingWordFsmState,
 )
-from app.game.timer import FsmTimerManager
+from app.game.timer import FsmTimerManager, TimeoutCallback
 from app.poller.schemes import Message
+from app.web.exceptions import UpdateGameStateError
 
 if typing.TYPE_CHECKING:
     from app.store.store import Store
@@ -21,7 +36,34 @@ if typing.TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+# TODO: Состояния не хранят данных игры, поэтому общие для всех FSM
+FSM_STATES: dict[GameState, BaseFsmState] = {
+    state: state_class(state)
+    for state, state_class in (
+        (GameState.WAITING_FOR_PLAYERS, PlayersWaitingFsmState),
+        (GameState.NEXT_PLAYER_TURN, NextPlayerTurnFsmState),
+        (GameState.PLAYER_TURN, PlayerTurnFsmState),
+        (GameState.WAITING_FOR_LETTER, WaitingLetterFsmState),
+        (GameState.WAITING_FOR_WORD, WaitingWordFsmState),
+        (GameState.CHECK_WINNER, CheckWinnerFsmState),
+        (GameState.GAME_FINISHED, FinishGameFsmState),
+    )
+}
+
+
 class Fsm:
+    __slots__ = (
+        "answer_index",
+        "chat_id",
+        "current_state",
+        "game",
+        "game_id",
+        "last_active",
+        "store",
+        "timer_manager",
+    )
+    states: typing.ClassVar[dict[GameState, BaseFsmState]] = FSM_STATES
+
     def __init__(
         self,
         store: "Store",
@@ -32,48 +74,160 @@ class Fsm:
         self.store = store
         self.chat_id = chat_id
         self.game_id = game_id
-        self.states: dict[GameState, BaseFsmState] = {}
         self.timer_manager = timer_manager
         self.current_state: BaseFsmState | None = None
-        self.current_player_tg_id: int | None = None
-        self.current_player_username: str | None = None
-        self.bonus_points: int = 0
-
-    async def restore_current_state(self, game: GameModel) -> None:
-        self.current_state = self.states.get(game.state)
-        self.bonus_points = game.bonus_points
-        if game.state != GameState.WAITING_FOR_PLAYERS:
-            self.current_player_tg_id = game.current_player.user.tg_user_id
-            self.current_player_username = game.current_player.user.username
-        await self.current_state.enter_()
+        self.game: GameSnapshot | None = None
+        self.answer_index: AnswerIndex | None = None
+        self.last_active = time.monotonic()
+
+    @property
+    def current_player_tg_id(self) -> int | None:
+        player = self.game.current_player if self.game else None
+        return player.tg_user_id if player else None
+
+    @property
+    def current_player_username(self) -> str | None:
+        player = self.game.current_player if self.game else None
+        return player.username if player else None
+
+    def init_game(
+        self,
+        game: GameModel,
+        question: QuestionModel,
+        players: Sequence[GameParticipantModel] = (),
+    ) -> None:
+        self.game = GameSnapshot.from_models(game, question, players)
+        self.answer_index = AnswerIndex.build(
+            question.answer, game.revealed_letters
+        )
+
+    def reveal_letter(self, letter: str) -> int:
+        letter = normalize_letters(letter)
+        self.game.reveal_letter(letter)
+        return self.answer_index.reveal(letter)
+
+    def record_event(
+        self,
+        event_type: GameEventType,
+        player: PlayerSnapshot | None = None,
+        **data: typing.Any,
+    ) -> None:
+        self.store.game_event_log.add(
+            self.game_id,
+            self.chat_id,
+            event_type,
+            player.participant_id if player else None,
+            **data,
+        )
+
+    async def load_game(self) -> None:
+        game = await self.store.game_accessor.get_game_with_players(
+            self.game_id
+        )
+        question = await self.store.question_cache.get(game.question_id)
+        self.init_game(game, question, game.game_participants)
+
+    async def flush(self) -> None:
+        if self.game is None or not self.game.is_dirty:
+            return
+        changes = self.game.pop_changes()
+        try:
+            (
+                revealed_letters,
+                points,
+            ) = await self.store.game_accessor.save_game_changes(
+                self.game_id, changes
+            )
+        except UpdateGameStateError:
+            # TODO: Изменения остаются в памяти до следующего сброса
+            self.game.restore_changes(changes)
+            raise
+        self.game.apply_saved(revealed_letters, points)
+
+    async def transition_players(
+        self,
+        from_states: Sequence[GameParticipantState],
+        state: GameParticipantState,
+    ) -> None:
+        # TODO: Сначала сбрасываем отложенные изменения, затем один UPDATE
+        await self.flush()
+        await self.store.game_accessor.update_status_players(
+            self.game_id, state, from_states
+        )
+        self.game.transition_players(from_states, state)
+
+    async def restore_current_state(self) -> None:
+        await self.load_game()
+        self.current_state = self.states.get(self.game.state)
+        await self.current_state.enter_(self)
+
+    async def resume(self) -> None:
+        # TODO: Восстановление без повторной отправки сообщений в чат
+        self.current_state = self.states[self.game.state]
+        remaining = None
+        if self.game.deadline_at is not None:
+            remaining = max(
+                (self.game.deadline_at - datetime.now(UTC)).total_seconds(), 0
+            )
+        await self.current_state.resume_(self, remaining)
+
+    def start_timer(
+        self,
+        seconds: float,
+        on_timeout: TimeoutCallback,
+    ) -> None:
+        self.game.set_deadline(datetime.now(UTC) + timedelta(seconds=seconds))
+        self.resume_timer(seconds, on_timeout)
+
+    def resume_timer(
+        self,
+        seconds: float,
+        on_timeout: TimeoutCallback,
+    ) -> None:
+        # TODO: Срок уже записан в БД, таймер только ставится в колесо.
+        #  Срабатывание выполняется под блокировкой чата
+        self.timer_manager.start(
+            seconds,
+            partial(self.store.fsm_manager.run_timeout, self, on_timeout),
+        )
+
+    def cancel_timer(self) -> None:
+        # TODO: Срок есть только у состояния с запущенным таймером
+        self.game.set_deadline(None)
+        self.timer_manager.cancel()
 
     async def set_current_state(self, state: GameState) -> None:
         if self.current_state == self.states.get(state):
             return
-        if self.current_state is not None:
-            await self.current_state.exit_()
-        await self.store.game_accessor.update_game_state(self.game_id, state)
-        self.current_state = self.states[state]
-        await self.current_state.enter_()
+        from_state = (
+            self.current_state.enum_state.name
+            if self.current_state is not None
+            else "NONE"
+        )
+        labeled(
+            self.store.bot_metrics.TRANSITIONS, from_state, state.name
+        ).inc()
+        with self.store.tracer.span(
+            "fsm.transition",
+            game_id=self.game_id,
+            from_state=from_state,
+            to_state=state.name,
+        ):
+            if self.current_state is not None:
+                await self.current_state.exit_(self)
+            self.game.set_state(state)
+            self.current_state = self.states[state]
+            await self.current_state.enter_(self)
+            # TODO: Состояние сбрасывается вместе с тем, что выставил enter_
+            #  (бонус за ход, срок таймера)
+            if self.store.config.game.durability == "transition":
+                await self.flush()
 
     async def update_current_state(
         self, context: Message | None = None
     ) -> None:
-        await self.current_state.update_(context)
-
-    def add_state(
-        self, name_state: GameState, state: type[BaseFsmState]
-    ) -> None:
-        self.states[name_state] = state(self, name_state)
+        await self.current_state.update_(self, context)
 
 
 def setup_fsm(store: "Store", chat_id: int, game_id: int) -> Fsm:
-    fsm = Fsm(store, chat_id, game_id, FsmTimerManager())
-    fsm.add_state(GameState.WAITING_FOR_PLAYERS, PlayersWaitingFsmState)
-    fsm.add_state(GameState.NEXT_PLAYER_TURN, NextPlayerTurnFsmState)
-    fsm.add_state(GameState.PLAYER_TURN, PlayerTurnFsmState)
-    fsm.add_state(GameState.WAITING_FOR_LETTER, WaitingLetterFsmState)
-    fsm.add_state(GameState.WAITING_FOR_WORD, WaitingWordFsmState)
-    fsm.add_state(GameState.CHECK_WINNER, CheckWinnerFsmState)
-    fsm.add_state(GameState.GAME_FINISHED, FinishGameFsmState)
-    return fsm
+    return Fsm(store, chat_id, game_id, FsmTimerManager(store.timing_wheel))
@@ -1,6 +1,16 @@
 import enum
-
-from sqlalchemy import BigInteger, ForeignKey, UniqueConstraint
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Identity,
+    Index,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.store.database.sqlalchemy_base import BaseModel
@@ -24,6 +34,16 @@ class GameParticipantState(enum.StrEnum):
     LEFT = "left"
 
 
+class GameEventType(enum.StrEnum):
+    JOIN = "join"
+    SPIN = "spin"
+    GUESS_LETTER = "guess_letter"
+    GUESS_WORD = "guess_word"
+    TIMEOUT = "timeout"
+    LEAVE = "leave"
+    WIN = "win"
+
+
 class GameModel(BaseModel):
     __tablename__ = "games"
 
@@ -40,6 +60,16 @@ class GameModel(BaseModel):
         ForeignKey("game_participants.participant_id", ondelete="SET NULL")
     )
     bonus_points: Mapped[int] = mapped_column(default=0)
+    participants_count: Mapped[int] = mapped_column(
+        default=0, server_default="0"
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True)
+    )
+    # TODO: Срок таймера текущего состояния, по нему таймер восстанавливается
+    deadline_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True)
+    )
 
     current_player: Mapped["GameParticipantModel"] = relationship(
         back_populates="current_game",
@@ -54,6 +84,28 @@ class GameModel(BaseModel):
         foreign_keys="[GameParticipantModel.game_id]",
     )
 
+    __table_args__ = (
+        # TODO: Одна незавершенная игра на чат, индекс только по живым играм
+        Index(
+            "ix_games_live_chat_id",
+            "chat_id",
+            unique=True,
+            postgresql_where=text("state <> 'GAME_FINISHED'"),
+        ),
+        # TODO: Поиск завершенных игр для переноса в архив
+        Index(
+            "ix_games_finished_at",
+            "finished_at",
+            postgresql_where=text("state = 'GAME_FINISHED'"),
+        ),
+        # TODO: Поиск игр с истекшим сроком таймера
+        Index(
+            "ix_games_deadline_at",
+            "deadline_at",
+            postgresql_where=text("deadline_at IS NOT NULL"),
+        ),
+    )
+
 
 class UserModel(BaseModel):
     __tablename__ = "users"
@@ -76,7 +128,6 @@ class GameParticipantModel(BaseModel):
     participant_id: Mapped[int] = mapped_column(primary_key=True)
     game_id: Mapped[int] = mapped_column(
         ForeignKey("games.game_id", ondelete="CASCADE"),
-        index=True,
     )
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.user_id", ondelete="CASCADE")
@@ -101,6 +152,7 @@ class GameParticipantModel(BaseModel):
 
     __table_args__ = (
         UniqueConstraint("user_id", "game_id", name="uq_user_game"),
+        Index("ix_game_participants_game_id_state", "game_id", "state"),
     )
 
 
@@ -110,3 +162,30 @@ class QuestionModel(BaseModel):
     question_id: Mapped[int] = mapped_column(primary_key=True)
     question: Mapped[str] = mapped_column(unique=True)
     answer: Mapped[str] = mapped_column(unique=True)
+
+
+# TODO: Журнал событий только дополняется, без внешних ключей,
+#  чтобы переживать перенос игр в архив
+class GameEventModel(BaseModel):
+    __tablename__ = "game_events"
+
+    event_id: Mapped[int] = mapped_column(
+        BigInteger, Identity(), primary_key=True
+    )
+    game_id: Mapped[int]
+    chat_id: Mapped[int] = mapped_column(BigInteger)
+    participant_id: Mapped[int | None]
+    event_type: Mapped[GameEventType]
+    data: Mapped[dict] = mapped_column(JSONB, default=dict)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # TODO: События игры по порядку для воспроизведения
+        Index("ix_game_events_game_id_event_id", "game_id", "event_id"),
+        # TODO: Выборки по времени для аналитики
+        Index(
+            "ix_game_events_created_at",
+            "created_at",
+            postgresql_using="brin",
+        ),
+    )
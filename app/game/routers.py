@@ -1,6 +1,6 @@
 import typing
 
-from app.game.views import QuestionAddView, QuestionDeleteView
+from app.game.views import ChatStatsView, QuestionAddView, QuestionDeleteView
 
 if typing.TYPE_CHECKING:
     from app.web.app import Application
@@ -9,3 +9,4 @@ if typing.TYPE_CHECKING:
 def setup_routes(app: "Application") -> None:
     app.router.add_view("/game/add_question", QuestionAddView)
     app.router.add_view("/game/delete_question", QuestionDeleteView)
+    app.router.add_view("/game/chat_stats", ChatStatsView)
@@ -39,3 +39,20 @@ class GameParticipantSchema(Schema):
     )
     turn_order = fields.Int()
     points = fields.Int(default=0)
+
+
+class ChatIdSchema(Schema):
+    chat_id = fields.Int(required=True)
+
+
+class PlayerStatsSchema(Schema):
+    tg_user_id = fields.Int()
+    username = fields.Str()
+    games = fields.Int()
+    wins = fields.Int()
+    points = fields.Int()
+
+
+class ChatStatsSchema(Schema):
+    chat_id = fields.Int()
+    players = fields.Nested(PlayerStatsSchema, many=True)
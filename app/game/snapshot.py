@@ -0,0 +1,274 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from app.game.models import (
+    GameModel,
+    GameParticipantModel,
+    GameParticipantState,
+    GameState,
+    QuestionModel,
+)
+from app.web.exceptions import FsmError
+
+# Участники, которые еще ходят по кругу
+ACTIVE_STATES = (GameParticipantState.ACTIVE_TURN, GameParticipantState.WAITING)
+
+
+@dataclass(slots=True)
+class PlayerSnapshot:
+    participant_id: int
+    user_id: int
+    tg_user_id: int
+    username: str
+    turn_order: int
+    state: GameParticipantState = GameParticipantState.WAITING
+    points: int = 0
+
+    @classmethod
+    def from_model(cls, player: GameParticipantModel) -> "PlayerSnapshot":
+        return cls(
+            participant_id=player.participant_id,
+            user_id=player.user_id,
+            tg_user_id=player.user.tg_user_id,
+            username=player.user.username,
+            turn_order=player.turn_order,
+            state=player.state,
+            points=player.points,
+        )
+
+
+class TurnRing:
+    __slots__ = ("_head", "_next", "_prev")
+
+    # TODO: Кольцо участников в порядке ходов. У выбывшего остается ссылка
+    #  на следующего, чтобы передать ход после него без поиска
+    def __init__(self) -> None:
+        self._head: int | None = None
+        self._next: dict[int, int] = {}
+        self._prev: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._prev)
+
+    def __contains__(self, participant_id: int) -> bool:
+        return participant_id in self._prev
+
+    def members(self) -> list[int]:
+        members: list[int] = []
+        participant_id = self._head
+        while participant_id is not None and len(members) < len(self._prev):
+            members.append(participant_id)
+            participant_id = self._next[participant_id]
+        return members
+
+    def add(self, participant_id: int) -> None:
+        if participant_id in self._prev:
+            return
+        if self._head is None:
+            self._head = participant_id
+            self._next[participant_id] = participant_id
+            self._prev[participant_id] = participant_id
+            return
+        tail = self._prev[self._head]
+        self._next[tail] = participant_id
+        self._prev[participant_id] = tail
+        self._next[participant_id] = self._head
+        self._prev[self._head] = participant_id
+
+    def remove(self, participant_id: int) -> None:
+        prev = self._prev.pop(participant_id, None)
+        if prev is None:
+            return
+        next_ = self._next[participant_id]
+        if next_ == participant_id:
+            self._head = None
+            return
+        self._next[prev] = next_
+        self._prev[next_] = prev
+        if self._head == participant_id:
+            self._head = next_
+
+    def next_after(self, participant_id: int) -> int | None:
+        if self._head is None:
+            return None
+        next_ = self._next.get(participant_id)
+        if next_ is None:
+            return self._head
+        # TODO: Цепочка выбывших всегда приводит к участнику в кольце
+        while next_ not in self._prev:
+            next_ = self._next[next_]
+        return next_
+
+
+@dataclass(slots=True)
+class GameChanges:
+    # Абсолютные значения полей games
+    values: dict[str, Any]
+    # Дельты, которые БД применяет выражениями || и +
+    letters: str
+    points: dict[int, int]
+    # Текущий статус каждого игрока, которого затронули изменения
+    states: dict[int, GameParticipantState]
+
+
+@dataclass(slots=True)
+class GameSnapshot:
+    game_id: int
+    chat_id: int
+    state: GameState
+    question_id: int
+    question: str
+    answer: str
+    revealed_letters: str = ""
+    bonus_points: int = 0
+    current_player_id: int | None = None
+    deadline_at: datetime | None = None
+    players: dict[int, PlayerSnapshot] = field(default_factory=dict)
+    turn_ring: TurnRing = field(default_factory=TurnRing)
+    _dirty: set[str] = field(default_factory=set)
+    _pending_letters: str = ""
+    _pending_points: dict[int, int] = field(default_factory=dict)
+    _pending_states: dict[int, GameParticipantState] = field(
+        default_factory=dict
+    )
+
+    @classmethod
+    def from_models(
+        cls,
+        game: GameModel,
+        question: QuestionModel,
+        players: Sequence[GameParticipantModel],
+    ) -> "GameSnapshot":
+        snapshot = cls(
+            game_id=game.game_id,
+            chat_id=game.chat_id,
+            state=game.state,
+            question_id=question.question_id,
+            question=question.question,
+            answer=question.answer,
+            revealed_letters=game.revealed_letters,
+            bonus_points=game.bonus_points,
+            current_player_id=game.current_player_id,
+            deadline_at=game.deadline_at,
+        )
+        for player in sorted(players, key=lambda p: p.turn_order):
+            snapshot.add_player(PlayerSnapshot.from_model(player))
+        return snapshot
+
+    @property
+    def current_player(self) -> PlayerSnapshot | None:
+        if self.current_player_id is None:
+            return None
+        return self.players.get(self.current_player_id)
+
+    def get_current_player(self) -> PlayerSnapshot:
+        player = self.current_player
+        if player is None:
+            raise FsmError(f"Game id[{self.game_id}] has no current player")
+        return player
+
+    @property
+    def is_dirty(self) -> bool:
+        return bool(
+            self._dirty
+            or self._pending_letters
+            or self._pending_points
+            or self._pending_states
+        )
+
+    def add_player(self, player: PlayerSnapshot) -> None:
+        # TODO: Участник уже записан в БД при регистрации
+        self.players[player.participant_id] = player
+        self._update_turn_ring(player)
+
+    def set_state(self, state: GameState) -> None:
+        if self.state != state:
+            self.state = state
+            self._dirty.add("state")
+
+    def reveal_letter(self, letter: str) -> None:
+        self.revealed_letters += letter
+        self._pending_letters += letter
+
+    def set_bonus_points(self, bonus_points: int) -> None:
+        self.bonus_points = bonus_points
+        self._dirty.add("bonus_points")
+
+    def set_current_player(self, player: PlayerSnapshot | None) -> None:
+        self.current_player_id = player.participant_id if player else None
+        self._dirty.add("current_player_id")
+
+    def set_deadline(self, deadline_at: datetime | None) -> None:
+        self.deadline_at = deadline_at
+        self._dirty.add("deadline_at")
+
+    def add_points(self, player: PlayerSnapshot, points: int) -> None:
+        player.points += points
+        self._pending_points[player.participant_id] = (
+            self._pending_points.get(player.participant_id, 0) + points
+        )
+
+    def set_player_state(
+        self, player: PlayerSnapshot, state: GameParticipantState
+    ) -> None:
+        player.state = state
+        self._pending_states[player.participant_id] = state
+        self._update_turn_ring(player)
+
+    def transition_players(
+        self,
+        from_states: Sequence[GameParticipantState],
+        state: GameParticipantState,
+    ) -> None:
+        # TODO: Статусы уже записаны в БД одним UPDATE, здесь только память
+        for player in self.players.values():
+            if player.state in from_states:
+                player.state = state
+                self._update_turn_ring(player)
+
+    def _update_turn_ring(self, player: PlayerSnapshot) -> None:
+        if player.state in ACTIVE_STATES:
+            self.turn_ring.add(player.participant_id)
+        else:
+            self.turn_ring.remove(player.participant_id)
+
+    def pop_changes(self) -> GameChanges:
+        changes = GameChanges(
+            values={name: getattr(self, name) for name in self._dirty},
+            letters=self._pending_letters,
+            points=self._pending_points,
+            states={
+                participant_id: self.players[participant_id].state
+                for participant_id in (
+                    self._pending_points.keys() | self._pending_states.keys()
+                )
+            },
+        )
+        self._dirty = set()
+        self._pending_letters = ""
+        self._pending_points = {}
+        self._pending_states = {}
+        return changes
+
+    def restore_changes(self, changes: GameChanges) -> None:
+        self._dirty.update(changes.values)
+        self._pending_letters = changes.letters + self._pending_letters
+        for participant_id, points in changes.points.items():
+            self._pending_points[participant_id] = (
+                self._pending_points.get(participant_id, 0) + points
+            )
+        for participant_id, state in changes.states.items():
+            self._pending_states.setdefault(participant_id, state)
+
+    def apply_saved(
+        self, revealed_letters: str | None, points: dict[int, int]
+    ) -> None:
+        # TODO: Значения из RETURNING плюс изменения, сделанные во время сброса
+        if revealed_letters is not None:
+            self.revealed_letters = revealed_letters + self._pending_letters
+        for participant_id, saved_points in points.items():
+            self.players[participant_id].points = (
+                saved_points + self._pending_points.get(participant_id, 0)
+            )
@@ -1,30 +1,157 @@
 import asyncio
+import logging
+import math
+import time
+import typing
 from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
 from typing import Any
 
+if typing.TYPE_CHECKING:
+    from app.store.store import Store
+
+logger = logging.getLogger(__name__)
+
+# Шаг колеса 0.1с, 4 уровня по 64 слота - сроки до ~19 суток
+TICK = 0.1
+WHEEL_BITS = 6
+WHEEL_SIZE = 1 << WHEEL_BITS
+WHEEL_MASK = WHEEL_SIZE - 1
+WHEEL_LEVELS = 4
+MAX_TICKS = (1 << (WHEEL_BITS * WHEEL_LEVELS)) - 1
+
+TimeoutCallback = Callable[[], Coroutine[Any, Any, None]]
+
+
+@dataclass(slots=True, eq=False)
+class Timer:
+    expire_tick: int
+    on_timeout: TimeoutCallback
+    slot: set["Timer"] | None = None
+
+
+class TimingWheel:
+    def __init__(self, store: "Store") -> None:
+        self.store = store
+        # TODO: Источник времени подменяется в симуляторе на виртуальный
+        self.clock: Callable[[], float] = time.monotonic
+        self.started_at = self.clock()
+        self.current_tick = 0
+        self.pending = 0
+        self.wheels: list[list[set[Timer]]] = [
+            [set() for _ in range(WHEEL_SIZE)] for _ in range(WHEEL_LEVELS)
+        ]
+        self.task: asyncio.Task | None = None
+        self.callback_tasks: set[asyncio.Task] = set()
+
+    async def connect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        self.store.bot_metrics.PENDING_TIMERS.set_function(lambda: self.pending)
+        self.task = asyncio.create_task(self._run())
+
+    async def disconnect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def schedule(self, seconds: float, on_timeout: TimeoutCallback) -> Timer:
+        ticks = min(max(math.ceil(seconds / TICK), 1), MAX_TICKS)
+        timer = Timer(self._now_tick() + ticks, on_timeout)
+        self._insert(timer)
+        self.pending += 1
+        return timer
+
+    def cancel(self, timer: Timer) -> None:
+        if timer.slot is None:
+            return
+        timer.slot.discard(timer)
+        timer.slot = None
+        self.pending -= 1
+
+    def _now_tick(self) -> int:
+        return int((self.clock() - self.started_at) / TICK)
+
+    def _insert(self, timer: Timer) -> None:
+        # TODO: Уровень по расстоянию до срока, слот по разрядам срока
+        diff = max(timer.expire_tick - self.current_tick, 0)
+        level = 0
+        while level < WHEEL_LEVELS - 1 and diff >= 1 << (
+            WHEEL_BITS * (level + 1)
+        ):
+            level += 1
+        index = (timer.expire_tick >> (WHEEL_BITS * level)) & WHEEL_MASK
+        timer.slot = self.wheels[level][index]
+        timer.slot.add(timer)
+
+    def _advance(self) -> None:
+        self.current_tick += 1
+        # TODO: Сначала старшие уровни: их таймеры спускаются на младшие
+        for level in range(WHEEL_LEVELS - 1, 0, -1):
+            if self.current_tick & ((1 << (WHEEL_BITS * level)) - 1):
+                continue
+            index = (self.current_tick >> (WHEEL_BITS * level)) & WHEEL_MASK
+            slot = self.wheels[level][index]
+            self.wheels[level][index] = set()
+            for timer in slot:
+                self._insert(timer)
+
+        index = self.current_tick & WHEEL_MASK
+        slot = self.wheels[0][index]
+        self.wheels[0][index] = set()
+        for timer in slot:
+            self._fire(timer)
+
+    def _fire(self, timer: Timer) -> None:
+        timer.slot = None
+        self.pending -= 1
+        lag = self.clock() - self.started_at - timer.expire_tick * TICK
+        self.store.bot_metrics.TIMER_LAG.observe(max(lag, 0))
+        task = asyncio.create_task(timer.on_timeout())
+        self.callback_tasks.add(task)
+        task.add_done_callback(self.callback_tasks.discard)
+
+    def tick(self) -> None:
+        # TODO: Догоняем текущее время, если цикл событий опоздал
+        now_tick = self._now_tick()
+        while self.current_tick < now_tick:
+            self._advance()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(
+                self.started_at + (self.current_tick + 1) * TICK - self.clock()
+            )
+            self.tick()
+
 
 class FsmTimerManager:
-    def __init__(self) -> None:
-        self._task: asyncio.Task | None = None
-        self._timeout_task: asyncio.Task | None = None
-
-    def start(
-        self,
-        seconds: int,
-        on_timeout: Callable[[], Coroutine[Any, Any, None]],
-    ) -> None:
-        self.cancel()
+    __slots__ = ("_timer", "wheel")
+
+    def __init__(self, wheel: TimingWheel) -> None:
+        self.wheel = wheel
+        self._timer: Timer | None = None
 
-        async def _run() -> None:
-            try:
-                await asyncio.sleep(seconds)
-            except asyncio.CancelledError:
-                return
-            self._timeout_task = asyncio.create_task(on_timeout())
+    @property
+    def is_pending(self) -> bool:
+        # TODO: Сработавший таймер тоже ждет обработки под блокировкой чата
+        return self._timer is not None
 
-        self._task = asyncio.create_task(_run())
+    @property
+    def is_expired(self) -> bool:
+        return self._timer is not None and self._timer.slot is None
+
+    def start(self, seconds: float, on_timeout: TimeoutCallback) -> None:
+        self.cancel()
+        self._timer = self.wheel.schedule(seconds, on_timeout)
 
     def cancel(self) -> None:
-        if self._task and not self._task.done():
-            self._task.cancel()
-        self._task = None
+        if self._timer is not None:
+            self.wheel.cancel(self._timer)
+            self._timer = None
+
+    def take_expired(self) -> bool:
+        # TODO: Срабатывание засчитывается один раз и только для таймера,
+        #  который не отменили и не перезапустили после срабатывания
+        if not self.is_expired:
+            return False
+        self._timer = None
+        return True
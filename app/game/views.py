@@ -2,9 +2,19 @@ import logging
 
 from aiohttp.web import Response
 from aiohttp.web_exceptions import HTTPConflict
-from aiohttp_apispec import docs, request_schema, response_schema
+from aiohttp_apispec import (
+    docs,
+    querystring_schema,
+    request_schema,
+    response_schema,
+)
 
-from app.game.schemes import QuestionIdSchema, QuestionSchema
+from app.game.schemes import (
+    ChatIdSchema,
+    ChatStatsSchema,
+    QuestionIdSchema,
+    QuestionSchema,
+)
 from app.web.app import View
 from app.web.auth import auth_required
 from app.web.exceptions import QuestionCreateError
@@ -39,3 +49,21 @@ class QuestionDeleteView(View):
             self.data["question_id"]
         )
         return json_response()
+
+
+class ChatStatsView(View):
+    @docs(tags=["game"], summary="Chat leaderboard with archived games")
+    @querystring_schema(ChatIdSchema)
+    @response_schema(ChatStatsSchema)
+    @auth_required
+    async def get(self) -> Response:
+        chat_id = self.data["chat_id"]
+        players = await self.store.game_accessor.get_chat_leaderboard(chat_id)
+        return json_response(
+            data=ChatStatsSchema().dump(
+                {
+                    "chat_id": chat_id,
+                    "players": [player._asdict() for player in players],
+                }
+            )
+        )
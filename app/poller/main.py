@@ -5,12 +5,12 @@ from app.poller.poller import setup_poller
 from app.web.config import get_config_path, load_config
 from app.web.logger import setup_logging
 
-setup_logging()
 logger = logging.getLogger(__name__)
 
 
 async def main() -> None:
     config = load_config(get_config_path())
+    setup_logging(config.logging)
     poller = setup_poller(config)
     try:
         await poller.start()
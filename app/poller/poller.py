@@ -5,6 +5,7 @@ from asyncio import Task
 from typing import Any
 
 import aio_pika
+from aio_pika.abc import HeadersType
 from pydantic import ValidationError
 
 from app.poller.schemes import CallbackQuery, Message, Update
@@ -26,6 +27,7 @@ class Poller:
         self.is_running = True
         await self.store.tg_api.connect()
         await self.store.broker.connect()
+        await self.store.tracer.connect()
         await self._initialize_queues()
         self.poll_task = asyncio.create_task(self.poll())
         logger.info("Polling started")
@@ -34,6 +36,7 @@ class Poller:
         self.is_running = False
         if self.poll_task:
             await self.poll_task
+        await self.store.tracer.disconnect()
         await self.store.broker.disconnect()
         await self.store.tg_api.disconnect()
         logger.info("Poller Stopped")
@@ -54,11 +57,7 @@ class Poller:
                 for update in updates["result"]:
                     update_scheme = self._parse_update(update)
                     if isinstance(update_scheme, Update):
-                        message = self.create_amqp_message(update_scheme)
-                        try:
-                            await self.add_to_queue(message)
-                        except aio_pika.exceptions.AMQPException as e:
-                            logger.error("Failed send message to queue: %s", e)
+                        await self.publish(update_scheme)
                         self.offset = update_scheme.update_id + 1
                     else:
                         self.offset = update_scheme + 1
@@ -66,16 +65,31 @@ class Poller:
                 logger.error("poller stopped with exception: %s", e)
                 await asyncio.sleep(5)
 
+    async def publish(self, update: Update) -> None:
+        # TODO: Трасса обновления начинается в поллере и продолжается в боте
+        with self.store.tracer.start_trace(
+            "poller.publish",
+            update_id=update.update_id,
+            chat_id=update.body.chat_id,
+        ):
+            message = self.create_amqp_message(update)
+            try:
+                await self.add_to_queue(message)
+            except aio_pika.exceptions.AMQPException as e:
+                logger.error("Failed send message to queue: %s", e)
+
     def create_amqp_message(self, data: Update) -> aio_pika.Message:
+        headers: HeadersType = {
+            "message_type": "telegram_update",
+            "encoding": "utf-8",
+            "chat_id": str(data.body.chat_id),
+        }
+        self.store.tracer.inject(headers)
         return aio_pika.Message(
             body=data.model_dump_json().encode(),
             content_type="application/json",
             delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-            headers={
-                "message_type": "telegram_update",
-                "encoding": "utf-8",
-                "chat_id": str(data.body.chat_id),
-            },
+            headers=headers,
         )
 
     async def add_to_queue(self, message: aio_pika.Message) -> None:
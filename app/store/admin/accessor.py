@@ -5,6 +5,7 @@ from sqlalchemy import delete, select
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from app.admin.models import AdminModel
+from app.bot.metrics import observe_db_method
 from app.web.exceptions import AdminCreateError, AdminDeleteError
 from app.web.utils import hash_password
 
@@ -32,11 +33,13 @@ class AdminAccessor:
         await self.delete_admin_by_email(self.store.config.admin.email)
         logger.info("Base Admin deleted successfully")
 
+    @observe_db_method
     async def get_by_email(self, email: str) -> AdminModel | None:
-        async with self.store.database.session_maker() as session:
+        async with self.store.database.read_session_maker() as session:
             stm = select(AdminModel).where(AdminModel.email == email)
             return await session.scalar(stm)
 
+    @observe_db_method
     async def create_admin(self, email: str, password: str) -> AdminModel:
         async with self.store.database.session_maker() as session:
             admin = AdminModel(email=email, password=password)
@@ -48,6 +51,7 @@ class AdminAccessor:
                 raise AdminCreateError(email) from e
             return admin
 
+    @observe_db_method
     async def delete_admin_by_email(self, email: str) -> None:
         async with self.store.database.session_maker() as session:
             stm = delete(AdminModel).where(AdminModel.email == email)
@@ -1,4 +1,5 @@
 import logging
+import time
 import typing
 
 from app.bot.handlers import (
@@ -10,6 +11,7 @@ from app.bot.handlers import (
     StartHandler,
     TextMessageHandler,
 )
+from app.bot.metrics import UPDATE_QUERIES, UpdateQueries, labeled
 from app.poller.schemes import CallbackQuery, Message, Update
 
 if typing.TYPE_CHECKING:
@@ -28,11 +30,45 @@ class BotManager:
         self.handlers[command] = handler(self.store)
 
     async def handle_updates(self, update: Update) -> None:
-        if isinstance(update.body, CallbackQuery):
-            handler = self.handlers.get(update.body.command)
-            await handler(update.body)
-        elif isinstance(update.body, Message):
-            await self.default_handler.handle(update.body)
+        async with self.store.fsm_manager.chat_lock(
+            update.body.chat_id, "update"
+        ):
+            await self._handle_update(update)
+
+    async def _handle_update(self, update: Update) -> None:
+        fsm = self.store.fsm_manager.get_fsm(update.body.chat_id)
+        if fsm is None:
+            fsm = await self.store.fsm_manager.rehydrate(update.body.chat_id)
+        state = (
+            fsm.current_state.enum_state.name
+            if fsm is not None and fsm.current_state is not None
+            else "NO_GAME"
+        )
+        handler_name = (
+            self.handlers.get(update.body.command).__class__.__name__
+            if isinstance(update.body, CallbackQuery)
+            else self.default_handler.__class__.__name__
+        )
+        queries = UpdateQueries()
+        token = UPDATE_QUERIES.set(queries)
+        start = time.perf_counter()
+        try:
+            if isinstance(update.body, CallbackQuery):
+                handler = self.handlers.get(update.body.command)
+                await handler(update.body)
+            elif isinstance(update.body, Message):
+                await self.default_handler.handle(update.body)
+        finally:
+            UPDATE_QUERIES.reset(token)
+            metrics = self.store.bot_metrics
+            labeled(metrics.UPDATE_LATENCY, handler_name, state).observe(
+                time.perf_counter() - start
+            )
+            # TODO: Update.date - время отправки сообщения в Telegram, секунды
+            metrics.UPDATE_LAG.observe(max(time.time() - update.date, 0))
+            labeled(metrics.DB_QUERIES_PER_UPDATE, handler_name, state).observe(
+                queries.count
+            )
 
     def set_default_handler(self, handler: type[TextMessageHandler]) -> None:
         self.default_handler = handler(self.store)
@@ -16,6 +16,8 @@ class RabbitMQClient:
         self.store = store
         self.connection: AbstractRobustConnection | None = None
         self.channel: AbstractChannel | None = None
+        # TODO: Тег подписки бота на свою очередь
+        self.consumer_tag: str | None = None
 
     async def connect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
         self.connection = await aio_pika.connect_robust(
@@ -28,5 +30,17 @@ class RabbitMQClient:
         logger.info("Connected to broker")
 
     async def disconnect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
-        await self.connection.close()
-        logger.info("Broker connection closed")
+        self.consumer_tag = None
+        if self.connection is not None:
+            await self.connection.close()
+            logger.info("Broker connection closed")
+
+    @property
+    def is_consuming(self) -> bool:
+        return (
+            self.consumer_tag is not None
+            and self.connection is not None
+            and not self.connection.is_closed
+            and self.channel is not None
+            and not self.channel.is_closed
+        )
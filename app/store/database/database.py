@@ -1,6 +1,14 @@
+import asyncio
+import contextlib
 import logging
+import time
 import typing
+from collections.abc import Callable
 
+import asyncpg
+from sqlalchemy import Connection, event, text
+from sqlalchemy.engine.interfaces import DBAPICursor
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -8,7 +16,9 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
 
+from app.bot.metrics import DB_METHOD, UPDATE_QUERIES, labeled
 from app.store.database.sqlalchemy_base import BaseModel
 
 if typing.TYPE_CHECKING:
@@ -17,6 +27,27 @@ if typing.TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Реплика, которая догнала основной сервер, имеет нулевое отставание
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    def connect(self) -> PoolProxiedConnection:
+        # TODO: Ожидание свободного соединения или открытие нового
+        start = time.perf_counter()
+        connection = super().connect()
+        connection.info["checkout_wait"] = time.perf_counter() - start
+        return connection
+
 
 class Database:
     def __init__(self, store: "Store") -> None:
@@ -24,16 +55,226 @@ class Database:
         self.engine: AsyncEngine | None = None
         self._db: type[DeclarativeBase] = BaseModel
         self.session_maker: async_sessionmaker[AsyncSession] | None = None
+        self.listen_connection: asyncpg.Connection | None = None
+        self.listeners: list[tuple[str, Callable]] = []
+        self.reconnect_callbacks: list[Callable[[], None]] = []
+        self.listen_lost = asyncio.Event()
+        self.listen_task: asyncio.Task | None = None
+        self.replica_engines: list[AsyncEngine] = []
+        self.replica_session_makers: list[async_sessionmaker[AsyncSession]] = []
+        self.healthy_replicas: list[async_sessionmaker[AsyncSession]] = []
+        self.replica_index = 0
+        self.replica_check_task: asyncio.Task | None = None
 
     async def connect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
-        self.engine = create_async_engine(
-            self.store.config.database.DATABASE_URL,
-        )
+        config = self.store.config.database
+        self.engine = self._create_engine(config.DATABASE_URL)
         self.session_maker = async_sessionmaker(
             bind=self.engine, expire_on_commit=False
         )
-        logger.info("Connected to database")
+        for url in config.replica_urls:
+            engine = self._create_engine(url)
+            self.replica_engines.append(engine)
+            self.replica_session_makers.append(
+                async_sessionmaker(bind=engine, expire_on_commit=False)
+            )
+        if self.replica_engines:
+            await self._check_replicas()
+            self.replica_check_task = asyncio.create_task(
+                self._replica_check_loop()
+            )
+        logger.info(
+            "Connected to database, replicas: %s", len(self.replica_engines)
+        )
 
     async def disconnect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        if self.replica_check_task is not None:
+            self.replica_check_task.cancel()
+            self.replica_check_task = None
+        if self.listen_task is not None:
+            self.listen_task.cancel()
+            self.listen_task = None
+        if self.listen_connection is not None:
+            await self.listen_connection.close()
+            self.listen_connection = None
+        self.listeners = []
+        self.reconnect_callbacks = []
+        for engine in self.replica_engines:
+            await engine.dispose()
+        self.replica_engines = []
+        self.replica_session_makers = []
+        self.healthy_replicas = []
         await self.engine.dispose()
         logger.info("Database connection closed")
+
+    async def ping(self) -> bool:
+        # TODO: Пул отдает соединение и сервер отвечает за readiness_timeout
+        if self.engine is None:
+            return False
+        timeout = self.store.config.metrics.readiness_timeout
+        try:
+            async with asyncio.timeout(timeout), self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except (TimeoutError, SQLAlchemyError, OSError) as e:
+            logger.warning("Database ping failed: %s", e)
+            return False
+        return True
+
+    @property
+    def read_session_maker(self) -> async_sessionmaker[AsyncSession]:
+        # TODO: Только для чтений, которым не нужна только что записанная
+        #  строка. Без подходящей реплики читаем с основного сервера
+        if not self.healthy_replicas:
+            return typing.cast(
+                async_sessionmaker[AsyncSession], self.session_maker
+            )
+        self.replica_index = (self.replica_index + 1) % len(
+            self.healthy_replicas
+        )
+        return self.healthy_replicas[self.replica_index]
+
+    def _create_engine(self, url: str) -> AsyncEngine:
+        engine = create_async_engine(url, poolclass=TimedQueuePool)
+        event.listen(engine.sync_engine, "engine_connect", self._on_connect)
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            self._before_cursor_execute,
+        )
+        event.listen(
+            engine.sync_engine,
+            "after_cursor_execute",
+            self._after_cursor_execute,
+        )
+        return engine
+
+    def _on_connect(self, connection: Connection) -> None:
+        wait = connection.connection.info.pop("checkout_wait", None)
+        if wait is not None:
+            self.store.bot_metrics.DB_CHECKOUT_WAIT.observe(wait)
+
+    def _before_cursor_execute(
+        self,
+        connection: Connection,
+        cursor: DBAPICursor,
+        statement: str,
+        *args: typing.Any,
+    ) -> None:
+        connection.info["query_start"] = time.perf_counter()
+
+    def _after_cursor_execute(
+        self,
+        connection: Connection,
+        cursor: DBAPICursor,
+        statement: str,
+        *args: typing.Any,
+    ) -> None:
+        elapsed = time.perf_counter() - connection.info.pop("query_start")
+        metrics = self.store.bot_metrics
+        method = DB_METHOD.get()
+        # TODO: Тип запроса вместо текста, чтобы не раздувать метки
+        kind = statement.lstrip().split(None, 1)[0].upper()
+        labeled(metrics.DB_STATEMENT_LATENCY, method, kind).observe(elapsed)
+        if cursor.rowcount >= 0:
+            labeled(metrics.DB_ROWS, method).observe(cursor.rowcount)
+        queries = UPDATE_QUERIES.get()
+        if queries is not None:
+            queries.count += 1
+
+    async def _check_replicas(self) -> None:
+        config = self.store.config.database
+        healthy = []
+        for engine, session_maker in zip(
+            self.replica_engines,
+            self.replica_session_makers,
+            strict=True,
+        ):
+            try:
+                async with asyncio.timeout(config.replica_check_interval):
+                    async with engine.connect() as connection:
+                        lag = await connection.scalar(REPLICA_LAG_SQL)
+            except (SQLAlchemyError, OSError, TimeoutError) as e:
+                logger.warning("Replica %s is unavailable: %s", engine.url, e)
+                continue
+            if lag > config.max_replica_lag:
+                logger.warning("Replica %s lags by %.1fs", engine.url, lag)
+                continue
+            healthy.append(session_maker)
+        self.healthy_replicas = healthy
+
+    async def _replica_check_loop(self) -> None:
+        while True:
+            await asyncio.sleep(
+                self.store.config.database.replica_check_interval
+            )
+            await self._check_replicas()
+
+    async def add_listener(
+        self,
+        channel: str,
+        callback: Callable,
+        on_reconnect: Callable[[], None] | None = None,
+    ) -> None:
+        # TODO: Для LISTEN нужно отдельное соединение вне пула SQLAlchemy.
+        #  NOTIFY, отправленные пока соединения не было, теряются,
+        #  поэтому подписчик узнает о каждом переподключении
+        if self.listen_connection is None:
+            await self._connect_listener()
+            self.listen_task = asyncio.create_task(self._listen_check_loop())
+        await self.listen_connection.add_listener(channel, callback)
+        self.listeners.append((channel, callback))
+        if on_reconnect is not None:
+            self.reconnect_callbacks.append(on_reconnect)
+
+    async def _connect_listener(self) -> None:
+        config = self.store.config.database
+        self.listen_connection = await asyncpg.connect(
+            host=config.host,
+            port=config.port,
+            user=config.user,
+            password=config.password,
+            database=config.database,
+        )
+        self.listen_connection.add_termination_listener(
+            lambda connection: self.listen_lost.set()
+        )
+        self.listen_lost.clear()
+
+    async def _is_listener_alive(self) -> bool:
+        if self.listen_lost.is_set() or self.listen_connection.is_closed():
+            return False
+        try:
+            async with asyncio.timeout(
+                self.store.config.database.listen_check_interval
+            ):
+                await self.listen_connection.execute("SELECT 1")
+        except (asyncpg.PostgresError, OSError, TimeoutError) as e:
+            logger.warning("LISTEN connection check failed: %s", e)
+            return False
+        return True
+
+    async def _reconnect_listener(self) -> None:
+        self.listen_connection.terminate()
+        await self._connect_listener()
+        for channel, callback in self.listeners:
+            await self.listen_connection.add_listener(channel, callback)
+        for on_reconnect in self.reconnect_callbacks:
+            on_reconnect()
+        logger.info("LISTEN connection restored")
+
+    async def _listen_check_loop(self) -> None:
+        # TODO: Разрыв замечаем сразу по termination listener,
+        #  зависшее соединение - по периодической проверке
+        interval = self.store.config.database.listen_check_interval
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self.listen_lost.wait(), interval)
+            if await self._is_listener_alive():
+                continue
+            logger.warning("LISTEN connection lost, reconnecting")
+            try:
+                await self._reconnect_listener()
+            except (asyncpg.PostgresError, OSError) as e:
+                logger.error("Failed to restore LISTEN connection: %s", e)
+                self.listen_lost.set()
+                await asyncio.sleep(interval)
@@ -1,12 +1,31 @@
 import logging
 import typing
 from collections.abc import Sequence
+from datetime import datetime
 
-from sqlalchemy import and_, delete, func, select
+from sqlalchemy import (
+    Integer,
+    Row,
+    and_,
+    bindparam,
+    column,
+    delete,
+    func,
+    literal,
+    select,
+    text,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError, NoResultFound, SQLAlchemyError
-from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import joinedload, selectinload
 
+from app.bot.metrics import observe_db_method
 from app.game.models import (
+    GameEventModel,
     GameModel,
     GameParticipantModel,
     GameParticipantState,
@@ -14,6 +33,9 @@ from app.game.models import (
     QuestionModel,
     UserModel,
 )
+from app.game.snapshot import GameChanges
+from app.store.cache import LRUCache
+from app.store.game.question_cache import QUESTIONS_CHANNEL
 from app.web.exceptions import (
     GameCreateError,
     ParticipantCreateError,
@@ -21,7 +43,6 @@ from app.web.exceptions import (
     QuestionCreateError,
     QuestionNotFoundError,
     UpdateGameStateError,
-    UpdateStatusPlayerError,
     UserCreateError,
 )
 
@@ -29,11 +50,39 @@ if typing.TYPE_CHECKING:
     from app.store.store import Store
 
 logger = logging.getLogger(__name__)
+FINISHED_STATE = bindparam(
+    "finished_state",
+    GameState.GAME_FINISHED,
+    type_=GameModel.state.type,
+    literal_execute=True,
+)
+
+# TODO: Статистика читает горячие таблицы вместе с архивом через view
+CHAT_LEADERBOARD_SQL = text(
+    """
+    SELECT u.tg_user_id, u.username,
+           count(*) AS games,
+           count(*) FILTER (WHERE p.state = 'WINNER') AS wins,
+           sum(p.points) AS points
+    FROM games_history AS g
+    JOIN game_participants_history AS p USING (game_id)
+    JOIN users AS u ON u.user_id = p.user_id
+    WHERE g.chat_id = :chat_id
+      AND g.state = 'GAME_FINISHED'
+    GROUP BY u.user_id, u.tg_user_id, u.username
+    ORDER BY wins DESC, points DESC, u.user_id
+    LIMIT :limit
+    """
+)
 
 
 class GameAccessor:
     def __init__(self, store: "Store") -> None:
         self.store = store
+        # TODO: tg_user_id -> (user_id, username) для повторных входов в игру
+        self.user_ids: LRUCache[int, tuple[int, str]] = LRUCache(
+            store.config.game.user_cache_size
+        )
 
     async def connect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
         try:
@@ -42,6 +91,7 @@ class GameAccessor:
         except QuestionCreateError:
             logger.info("The first question has already been created")
 
+    @observe_db_method
     async def create_game(
         self,
         chat_id: int,
@@ -60,25 +110,9 @@ class GameAccessor:
                 raise GameCreateError(chat_id) from e
             return game
 
-    async def update_game_state(self, game_id: int, state: GameState) -> None:
-        async with self.store.database.session_maker() as session:
-            game = await session.get(GameModel, game_id)
-            game.state = state
-            try:
-                await session.commit()
-            except SQLAlchemyError as e:
-                logger.error(e)
-                raise UpdateGameStateError(game_id) from e
-
-    async def update_game_bonus_points(
-        self, game: GameModel, bonus_points: int
-    ) -> None:
-        async with self.store.database.session_maker() as session:
-            game.bonus_points = bonus_points
-            session.add(game)
-            await session.commit()
-
+    @observe_db_method
     async def get_running_game(self, chat_id: int) -> GameModel | None:
+        # TODO: Чтение после записи, только основной сервер
         async with self.store.database.session_maker() as session:
             stm = (
                 select(GameModel)
@@ -90,62 +124,156 @@ class GameAccessor:
                 .where(
                     and_(
                         GameModel.chat_id == chat_id,
-                        GameModel.state != GameState.GAME_FINISHED,
+                        # TODO: Литерал в SQL, чтобы даже generic-план
+                        # использовал частичный индекс ix_games_live_chat_id
+                        GameModel.state != FINISHED_STATE,
                     )
                 )
             )
             return await session.scalar(stm)
 
-    async def get_game_by_game_id(self, game_id: int) -> GameModel:
+    @observe_db_method
+    async def get_game_with_players(self, game_id: int) -> GameModel:
+        # TODO: Чтение после записи, только основной сервер
         async with self.store.database.session_maker() as session:
             stm = (
                 select(GameModel)
                 .options(
-                    joinedload(GameModel.question),
-                    joinedload(GameModel.current_player).joinedload(
+                    selectinload(GameModel.game_participants).joinedload(
                         GameParticipantModel.user
-                    ),
+                    )
                 )
                 .where(GameModel.game_id == game_id)
             )
             result = await session.scalar(stm)
             return typing.cast(GameModel, result)
 
-    async def update_revealed_letters(
-        self, game: GameModel, letter: str
-    ) -> None:
+    @observe_db_method
+    async def get_live_games(self) -> Sequence[tuple[int, int]]:
+        # TODO: Только game_id и chat_id, читается из ix_games_live_chat_id
         async with self.store.database.session_maker() as session:
-            game.revealed_letters += letter
-            session.add(game)
-            try:
-                await session.commit()
-            except SQLAlchemyError as e:
-                logger.error(e)
+            stm = select(GameModel.game_id, GameModel.chat_id).where(
+                GameModel.state != FINISHED_STATE
+            )
+            result = await session.execute(stm)
+            return result.tuples().all()
 
-    async def set_current_player(
-        self, game: GameModel, player: GameParticipantModel
-    ) -> None:
+    @observe_db_method
+    async def get_live_game_ids(self, game_ids: Sequence[int]) -> set[int]:
+        # TODO: Завершенные и перенесенные в архив игры не возвращаются
         async with self.store.database.session_maker() as session:
-            game.current_player = player
-            session.add(game)
-            try:
-                await session.commit()
-            except SQLAlchemyError as e:
-                logger.error(e)
+            stm = select(GameModel.game_id).where(
+                GameModel.game_id.in_(game_ids),
+                GameModel.state != FINISHED_STATE,
+            )
+            return set(await session.scalars(stm))
 
-    async def add_points_player(
+    @observe_db_method
+    async def get_expired_games(
         self,
-        player: GameParticipantModel,
-        points: int,
-    ) -> None:
+        after: tuple[datetime | None, int] | None = None,
+        limit: int = 500,
+    ) -> Sequence[tuple[int, int, datetime | None]]:
+        # TODO: Диапазон по частичному индексу ix_games_deadline_at,
+        #  страницы по ключу (deadline_at, game_id)
+        async with self.store.database.session_maker() as session:
+            stm = (
+                select(
+                    GameModel.game_id, GameModel.chat_id, GameModel.deadline_at
+                )
+                .where(GameModel.deadline_at < func.now())
+                .order_by(GameModel.deadline_at, GameModel.game_id)
+                .limit(limit)
+            )
+            if after is not None:
+                stm = stm.where(
+                    tuple_(GameModel.deadline_at, GameModel.game_id)
+                    > tuple_(*after)
+                )
+            result = await session.execute(stm)
+            return result.tuples().all()
+
+    @observe_db_method
+    async def get_games_with_players(
+        self, game_ids: Sequence[int]
+    ) -> Sequence[GameModel]:
+        async with self.store.database.session_maker() as session:
+            stm = (
+                select(GameModel)
+                .options(
+                    selectinload(GameModel.game_participants).joinedload(
+                        GameParticipantModel.user
+                    )
+                )
+                .where(GameModel.game_id.in_(game_ids))
+            )
+            result = await session.scalars(stm)
+            return result.all()
+
+    @observe_db_method
+    async def save_game_changes(
+        self, game_id: int, changes: GameChanges
+    ) -> tuple[str | None, dict[int, int]]:
+        revealed_letters: str | None = None
+        points: dict[int, int] = {}
+        game_values = dict(changes.values)
+        if game_values.get("state") == GameState.GAME_FINISHED:
+            game_values["finished_at"] = func.now()
         async with self.store.database.session_maker() as session:
-            player.points += points
-            session.add(player)
             try:
+                if game_values or changes.letters:
+                    revealed_letters = await session.scalar(
+                        update(GameModel)
+                        .where(GameModel.game_id == game_id)
+                        .values(
+                            **game_values,
+                            revealed_letters=GameModel.revealed_letters.concat(
+                                changes.letters
+                            ),
+                        )
+                        .returning(GameModel.revealed_letters)
+                    )
+                if changes.states:
+                    points = await self._update_players(session, changes)
                 await session.commit()
             except SQLAlchemyError as e:
                 logger.error(e)
+                raise UpdateGameStateError(game_id) from e
+        return revealed_letters, points
 
+    @staticmethod
+    async def _update_players(
+        session: AsyncSession, changes: GameChanges
+    ) -> dict[int, int]:
+        # TODO: Одно UPDATE ... FROM (VALUES ...) на всех измененных игроков
+        rows = values(
+            column("p_id", Integer),
+            column("p_points", Integer),
+            column("p_state", GameParticipantModel.state.type),
+            name="changes",
+        ).data(
+            [
+                (participant_id, changes.points.get(participant_id, 0), state)
+                for participant_id, state in changes.states.items()
+            ]
+        )
+        stm = (
+            update(GameParticipantModel)
+            .where(GameParticipantModel.participant_id == rows.c.p_id)
+            .values(
+                points=GameParticipantModel.points + rows.c.p_points,
+                state=rows.c.p_state,
+            )
+            .returning(
+                GameParticipantModel.participant_id,
+                GameParticipantModel.points,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(stm)
+        return {row.participant_id: row.points for row in result}
+
+    @observe_db_method
     async def create_question(
         self, question: str, answer: str
     ) -> QuestionModel:
@@ -153,24 +281,97 @@ class GameAccessor:
             question_model = QuestionModel(question=question, answer=answer)
             session.add(question_model)
             try:
+                await session.flush()
+                await self._notify_questions_changed(
+                    session, question_model.question_id
+                )
                 await session.commit()
             except SQLAlchemyError as e:
                 logger.error(e)
                 raise QuestionCreateError(question, answer) from e
             return question_model
 
+    @observe_db_method
     async def delete_question_by_id(self, question_id: int) -> None:
         async with self.store.database.session_maker() as session:
             stm = delete(QuestionModel).where(
                 QuestionModel.question_id == question_id
             )
             await session.execute(stm)
+            await self._notify_questions_changed(session, question_id)
             try:
                 await session.commit()
             except SQLAlchemyError as e:
                 logger.error(e)
 
+    @staticmethod
+    async def _notify_questions_changed(
+        session: AsyncSession, question_id: int
+    ) -> None:
+        # TODO: NOTIFY доставляется слушателям только после commit
+        await session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": QUESTIONS_CHANNEL, "payload": str(question_id)},
+        )
+
+    @observe_db_method
+    async def get_question_by_id(self, question_id: int) -> QuestionModel:
+        questions = await self._get_questions([question_id])
+        if not questions:
+            raise QuestionNotFoundError(f"Question id[{question_id}] not found")
+        return questions[0]
+
+    @observe_db_method
+    async def get_questions_by_ids(
+        self, question_ids: Sequence[int]
+    ) -> Sequence[QuestionModel]:
+        return await self._get_questions(question_ids)
+
+    async def _get_questions(
+        self, question_ids: Sequence[int]
+    ) -> Sequence[QuestionModel]:
+        # TODO: Промахи кэша вопросов читаются с реплики. Вопрос игры уже
+        #  записан на основном сервере: если реплика его еще не получила,
+        #  недостающие вопросы дочитываются с основного
+        database = self.store.database
+        session_maker = typing.cast(
+            async_sessionmaker[AsyncSession], database.session_maker
+        )
+        read_session_maker = database.read_session_maker
+        questions = await self._select_questions(
+            read_session_maker, question_ids
+        )
+        if read_session_maker is session_maker:
+            return questions
+        found = {question.question_id for question in questions}
+        missing = [
+            question_id
+            for question_id in question_ids
+            if question_id not in found
+        ]
+        if not missing:
+            return questions
+        return [
+            *questions,
+            *await self._select_questions(session_maker, missing),
+        ]
+
+    @staticmethod
+    async def _select_questions(
+        session_maker: async_sessionmaker[AsyncSession],
+        question_ids: Sequence[int],
+    ) -> Sequence[QuestionModel]:
+        async with session_maker() as session:
+            stm = select(QuestionModel).where(
+                QuestionModel.question_id.in_(question_ids)
+            )
+            result = await session.scalars(stm)
+            return result.all()
+
+    @observe_db_method
     async def get_random_question(self) -> QuestionModel:
+        # TODO: Только основной сервер: реплика может вернуть вопрос, уже
+        #  удаленный на основном, и INSERT игры упадет на внешнем ключе
         async with self.store.database.session_maker() as session:
             stm = select(QuestionModel).order_by(func.random()).limit(1)
             result = await session.execute(stm)
@@ -180,48 +381,89 @@ class GameAccessor:
                 logger.error("There is no question in the DB")
                 raise QuestionNotFoundError("The database is empty ") from e
 
-    async def get_user_by_tg_id(self, tg_user_id: int) -> UserModel | None:
-        async with self.store.database.session_maker() as session:
-            return await session.scalar(
-                select(UserModel).where(UserModel.tg_user_id == tg_user_id)
-            )
-
-    async def create_user(
+    async def upsert_user(
         self,
         tg_user_id: int,
         username: str,
         first_name: str | None = None,
         last_name: str | None = None,
-    ) -> UserModel:
+    ) -> int:
+        # TODO: Попадание в кэш не идет в БД и не попадает в метрики запросов
+        cached = self.user_ids.get(tg_user_id)
+        if cached is not None and cached[1] == username:
+            return cached[0]
+        return await self._upsert_user(
+            tg_user_id, username, first_name, last_name
+        )
+
+    @observe_db_method
+    async def _upsert_user(
+        self,
+        tg_user_id: int,
+        username: str,
+        first_name: str | None,
+        last_name: str | None,
+    ) -> int:
+        stm = insert(UserModel).values(
+            tg_user_id=tg_user_id,
+            username=username,
+            first_name=first_name,
+            last_name=last_name,
+        )
+        upsert = stm.on_conflict_do_update(
+            index_elements=[UserModel.tg_user_id],
+            set_={"username": stm.excluded.username},
+        ).returning(UserModel.user_id)
         async with self.store.database.session_maker() as session:
-            user = UserModel(
-                tg_user_id=tg_user_id,
-                username=username,
-                first_name=first_name,
-                last_name=last_name,
-            )
-            session.add(user)
             try:
+                user_id = await session.scalar(upsert)
                 await session.commit()
             except SQLAlchemyError as e:
                 logger.error(e)
                 raise UserCreateError(tg_user_id) from e
-            return user
+        user_id = typing.cast(int, user_id)
+        self.user_ids.put(tg_user_id, (user_id, username))
+        return user_id
 
-    async def create_game_participant(
+    @observe_db_method
+    async def register_participant(
         self,
         game_id: int,
         user_id: int,
-        turn_order: int,
-    ) -> GameParticipantModel:
-        async with self.store.database.session_maker() as session:
-            player = GameParticipantModel(
-                game_id=game_id,
-                user_id=user_id,
-                turn_order=turn_order,
+    ) -> tuple[int, int]:
+        # TODO: Счетчик в games выдает turn_order атомарно под блокировкой
+        # строки игры, поэтому одновременные join не получат один номер
+        counter = (
+            update(GameModel)
+            .where(GameModel.game_id == game_id)
+            .values(participants_count=GameModel.participants_count + 1)
+            .returning(GameModel.participants_count)
+            .cte("counter")
+        )
+        stm = (
+            insert(GameParticipantModel)
+            .from_select(
+                ["game_id", "user_id", "turn_order", "state", "points"],
+                select(
+                    literal(game_id),
+                    literal(user_id),
+                    counter.c.participants_count - 1,
+                    literal(
+                        GameParticipantState.WAITING,
+                        GameParticipantModel.state.type,
+                    ),
+                    literal(0),
+                ),
+            )
+            .add_cte(counter)
+            .returning(
+                GameParticipantModel.participant_id,
+                GameParticipantModel.turn_order,
             )
-            session.add(player)
+        )
+        async with self.store.database.session_maker() as session:
             try:
+                row = (await session.execute(stm)).one_or_none()
                 await session.commit()
             except IntegrityError as e:
                 logger.warning("The participant is already registered")
@@ -229,67 +471,66 @@ class GameAccessor:
             except SQLAlchemyError as e:
                 logger.error(e)
                 raise ParticipantCreateError(game_id, user_id) from e
-            return player
-
-    async def get_count_participant(self, game_id: int) -> int:
-        async with self.store.database.session_maker() as session:
-            stm = select(func.count(1)).where(
-                GameParticipantModel.game_id == game_id
-            )
-            result = await session.scalar(stm)
-            return typing.cast(int, result)
-
-    async def get_players_by_game_id(
-        self, game_id: int
-    ) -> Sequence[GameParticipantModel]:
-        async with self.store.database.session_maker() as session:
-            stm = (
-                select(GameParticipantModel)
-                .options(joinedload(GameParticipantModel.user))
-                .where(GameParticipantModel.game_id == game_id)
-            )
-            result = await session.scalars(stm)
-            return result.all()
+        if row is None:
+            raise ParticipantCreateError(game_id, user_id)
+        return row.participant_id, row.turn_order + 1
 
-    async def get_active_player(
-        self, game_id: int
-    ) -> GameParticipantModel | None:
+    @observe_db_method
+    async def update_status_players(
+        self,
+        game_id: int,
+        status: GameParticipantState,
+        from_statuses: Sequence[GameParticipantState],
+    ) -> int:
+        # TODO: Один set-based UPDATE на всю игру вместо UPDATE на каждого
         async with self.store.database.session_maker() as session:
             stm = (
-                select(GameParticipantModel)
-                .options(joinedload(GameParticipantModel.user))
+                update(GameParticipantModel)
                 .where(
                     and_(
                         GameParticipantModel.game_id == game_id,
-                        GameParticipantModel.state
-                        == GameParticipantState.ACTIVE_TURN,
+                        GameParticipantModel.state.in_(from_statuses),
                     )
                 )
+                .values(state=status)
+                .execution_options(synchronize_session=False)
             )
-            return await session.scalar(stm)
-
-    async def update_status_player(
-        self,
-        player: GameParticipantModel,
-        status: GameParticipantState,
-    ) -> None:
-        async with self.store.database.session_maker() as session:
-            player.state = status
-            session.add(player)
             try:
+                result = await session.execute(stm)
                 await session.commit()
             except SQLAlchemyError as e:
                 logger.error(e)
-                raise UpdateStatusPlayerError(
-                    player.participant_id,
-                    status,
-                ) from e
+                raise UpdateGameStateError(game_id) from e
+            return result.rowcount
+
+    @observe_db_method
+    async def get_chat_leaderboard(
+        self, chat_id: int, limit: int = 10
+    ) -> Sequence[Row]:
+        # TODO: Завершенные игры не меняются, отставание реплики допустимо
+        async with self.store.database.read_session_maker() as session:
+            result = await session.execute(
+                CHAT_LEADERBOARD_SQL, {"chat_id": chat_id, "limit": limit}
+            )
+            return result.all()
 
-    async def update_status_many_players(
-        self, players: list[GameParticipantModel], status: GameParticipantState
+    @observe_db_method
+    async def add_game_events(
+        self, events: Sequence[dict[str, typing.Any]]
     ) -> None:
+        # TODO: Пачка событий одним executemany
         async with self.store.database.session_maker() as session:
-            for p in players:
-                p.state = status
-            session.add_all(players)
+            await session.execute(insert(GameEventModel), events)
             await session.commit()
+
+    @observe_db_method
+    async def get_game_events(self, game_id: int) -> Sequence[GameEventModel]:
+        # TODO: Воспроизведение игры по индексу ix_game_events_game_id_event_id
+        async with self.store.database.session_maker() as session:
+            stm = (
+                select(GameEventModel)
+                .where(GameEventModel.game_id == game_id)
+                .order_by(GameEventModel.event_id)
+            )
+            result = await session.scalars(stm)
+            return result.all()
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import typing
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+if typing.TYPE_CHECKING:
+    from app.store.store import Store
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_TABLES = ("games_archive", "game_participants_archive")
+
+ARCHIVE_MONTHS_SQL = text(
+    """
+    SELECT DISTINCT date_trunc('month', finished_at) AS month
+    FROM games
+    WHERE state = 'GAME_FINISHED'
+      AND finished_at < now() - make_interval(days => :retention_days)
+    """
+)
+
+# Одна пачка игр переносится одним запросом: участники удаляются каскадом
+ARCHIVE_BATCH_SQL = text(
+    """
+    WITH batch AS (
+        SELECT game_id
+        FROM games
+        WHERE state = 'GAME_FINISHED'
+          AND finished_at < now() - make_interval(days => :retention_days)
+        ORDER BY finished_at
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    ),
+    participants AS (
+        SELECT p.*
+        FROM game_participants AS p
+        JOIN batch USING (game_id)
+    ),
+    moved_games AS (
+        DELETE FROM games AS g
+        USING batch AS b
+        WHERE g.game_id = b.game_id
+        RETURNING g.*
+    ),
+    moved_participants AS (
+        INSERT INTO game_participants_archive (
+            participant_id, game_id, user_id, state,
+            turn_order, points, finished_at
+        )
+        SELECT p.participant_id, p.game_id, p.user_id, p.state,
+               p.turn_order, p.points, g.finished_at
+        FROM participants AS p
+        JOIN moved_games AS g USING (game_id)
+    )
+    INSERT INTO games_archive (
+        game_id, chat_id, state, question_id, revealed_letters,
+        current_player_id, bonus_points, participants_count, finished_at
+    )
+    SELECT game_id, chat_id, state, question_id, revealed_letters,
+           current_player_id, bonus_points, participants_count, finished_at
+    FROM moved_games
+    """
+)
+
+
+class GameArchiver:
+    def __init__(self, store: "Store") -> None:
+        self.store = store
+        self.task: asyncio.Task | None = None
+
+    async def connect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        config = self.store.config.archive
+        if config is None or not config.enabled:
+            return
+        self.task = asyncio.create_task(self._archive_loop())
+        logger.info(
+            "Game archiver started, retention_days=%s", config.retention_days
+        )
+
+    async def disconnect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def _archive_loop(self) -> None:
+        while True:
+            try:
+                moved = await self.archive_finished_games()
+                if moved:
+                    logger.info("Archived %s finished games", moved)
+            except SQLAlchemyError as e:
+                logger.error("Failed to archive finished games: %s", e)
+            await asyncio.sleep(self.store.config.archive.interval)
+
+    async def archive_finished_games(self) -> int:
+        config = self.store.config.archive
+        await self._create_partitions()
+        total = 0
+        while True:
+            moved = await self._archive_batch()
+            total += moved
+            if moved < config.batch_size:
+                return total
+            # TODO: Пауза между пачками, чтобы не занимать блокировки подряд
+            await asyncio.sleep(config.batch_pause)
+
+    async def _archive_batch(self) -> int:
+        config = self.store.config.archive
+        async with self.store.database.session_maker() as session:
+            await self._set_lock_timeout(session)
+            result = await session.execute(
+                ARCHIVE_BATCH_SQL,
+                {
+                    "retention_days": config.retention_days,
+                    "batch_size": config.batch_size,
+                },
+            )
+            await session.commit()
+            return result.rowcount
+
+    async def _create_partitions(self) -> None:
+        config = self.store.config.archive
+        async with self.store.database.session_maker() as session:
+            months = await session.scalars(
+                ARCHIVE_MONTHS_SQL, {"retention_days": config.retention_days}
+            )
+            for month in months.all():
+                for table in ARCHIVE_TABLES:
+                    await session.execute(
+                        text(self._partition_ddl(table, month))
+                    )
+            await session.commit()
+
+    async def _set_lock_timeout(self, session: AsyncSession) -> None:
+        lock_timeout = int(self.store.config.archive.lock_timeout_ms)
+        await session.execute(text(f"SET LOCAL lock_timeout = {lock_timeout}"))
+
+    @staticmethod
+    def _partition_ddl(table: str, month: datetime) -> str:
+        start = month.date().replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+        return (
+            f"CREATE TABLE IF NOT EXISTS {table}_{start:%Y_%m} "
+            f"PARTITION OF {table} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
@@ -0,0 +1,125 @@
+import asyncio
+import contextlib
+import logging
+import typing
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from itertools import batched
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.game.models import GameEventModel, GameEventType
+
+if typing.TYPE_CHECKING:
+    from app.store.store import Store
+
+logger = logging.getLogger(__name__)
+
+
+class GameEventLog:
+    def __init__(self, store: "Store") -> None:
+        self.store = store
+        self.pending: list[dict[str, typing.Any]] = []
+        self.batch_ready = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        config = self.store.config.event_log
+        return config is not None and config.enabled
+
+    async def connect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        if not self.enabled:
+            return
+        self.store.bot_metrics.PENDING_GAME_EVENTS.set_function(
+            lambda: len(self.pending)
+        )
+        self.task = asyncio.create_task(self._flush_loop())
+
+    async def disconnect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        # TODO: Прерванный сброс возвращает пачку в очередь, последний сброс
+        #  пишет все, что накопилось до остановки
+        if self.task is not None:
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
+            self.task = None
+        await self.flush()
+
+    def add(
+        self,
+        game_id: int,
+        chat_id: int,
+        event_type: GameEventType,
+        participant_id: int | None = None,
+        **data: typing.Any,
+    ) -> None:
+        # TODO: Запись в БД откладывается, обработка обновления не ждет
+        if not self.enabled:
+            return
+        self.pending.append(
+            {
+                "game_id": game_id,
+                "chat_id": chat_id,
+                "participant_id": participant_id,
+                "event_type": event_type,
+                "data": data,
+                "created_at": datetime.now(UTC),
+            }
+        )
+        self.store.bot_metrics.GAME_EVENTS.labels(event_type.name).inc()
+        self._drop_overflow()
+        if len(self.pending) >= self.store.config.event_log.batch_size:
+            self.batch_ready.set()
+
+    async def flush(self) -> None:
+        if not self.pending:
+            return
+        events, self.pending = self.pending, []
+        written = 0
+        try:
+            for batch in batched(
+                events, self.store.config.event_log.batch_size
+            ):
+                await self.store.game_accessor.add_game_events(batch)
+                written += len(batch)
+        except SQLAlchemyError as e:
+            logger.error("Failed to write game events: %s", e)
+            self._requeue(events[written:])
+        except BaseException:
+            self._requeue(events[written:])
+            raise
+
+    async def get_events(self, game_id: int) -> Sequence[GameEventModel]:
+        # TODO: События игры в порядке записи: сначала сбрасываем очередь,
+        #  затем читаем из БД
+        await self.flush()
+        return await self.store.game_accessor.get_game_events(game_id)
+
+    def _requeue(self, events: list[dict[str, typing.Any]]) -> None:
+        # TODO: Незаписанные события пишутся первыми, порядок сохраняется
+        self.pending = events + self.pending
+        self._drop_overflow()
+
+    def _drop_overflow(self) -> None:
+        # TODO: При переполнении теряются самые старые события
+        dropped = len(self.pending) - self.store.config.event_log.max_pending
+        if dropped > 0:
+            del self.pending[:dropped]
+            self.store.bot_metrics.DROPPED_GAME_EVENTS.inc(dropped)
+            logger.warning("Dropped %s game events", dropped)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self.batch_ready.wait(),
+                    self.store.config.event_log.flush_interval,
+                )
+            except TimeoutError:
+                pass
+            self.batch_ready.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Failed to flush game events: %s", e)
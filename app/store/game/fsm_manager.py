@@ -1,27 +1,325 @@
+import asyncio
+import logging
+import time
 import typing
+from collections.abc import AsyncGenerator, Callable, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from itertools import batched
 
-from app.bot.metrics import decrement_active_games, increment_active_games
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.bot.metrics import labeled
 from app.game.fsm import Fsm, setup_fsm
+from app.game.models import GameEventType, GameState
+from app.game.timer import TimeoutCallback
+from app.store.cache import LRUCache
+from app.web.exceptions import AppError, UpdateGameStateError
 
 if typing.TYPE_CHECKING:
     from app.store.store import Store
 
+logger = logging.getLogger(__name__)
+
+RESTORE_BATCH_SIZE = 500
+DEADLINE_SCAN_BATCH_SIZE = 500
+EVICTED_CACHE_SIZE = 100_000
+
+
+@dataclass(slots=True)
+class ChatLock:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Задачи, которые держат или ждут блокировку
+    users: int = 0
+
 
 class FsmManager:
     def __init__(self, store: "Store") -> None:
         self.store = store
         self.fsm_storage: dict[int, Fsm] = {}
+        # TODO: chat_id -> game_id выгруженных из памяти игр
+        self.evicted: LRUCache[int, int] = LRUCache(EVICTED_CACHE_SIZE)
+        self.flush_task: asyncio.Task | None = None
+        self.deadline_task: asyncio.Task | None = None
+        self.eviction_task: asyncio.Task | None = None
+        self.chat_locks: dict[int, ChatLock] = {}
+
+    async def connect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        self.store.bot_metrics.RESIDENT_FSMS.set_function(
+            lambda: len(self.fsm_storage)
+        )
+        self.store.bot_metrics.CHAT_LOCKS.set_function(
+            lambda: len(self.chat_locks)
+        )
+        self.store.bot_metrics.ACTIVE_GAMES.set_function(self.count_games)
+        self.store.bot_metrics.ACTIVE_PLAYERS.set_function(self.count_players)
+        if self.store.config.game.durability == "interval":
+            self.flush_task = asyncio.create_task(self._flush_loop())
+        self.eviction_task = asyncio.create_task(self._eviction_loop())
+
+    async def disconnect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+        if self.deadline_task is not None:
+            self.deadline_task.cancel()
+            self.deadline_task = None
+        if self.eviction_task is not None:
+            self.eviction_task.cancel()
+            self.eviction_task = None
+        await self.flush_all()
+
+    @asynccontextmanager
+    async def chat_lock(
+        self, chat_id: int, source: str
+    ) -> AsyncGenerator[None]:
+        # TODO: Обновления и срабатывания таймеров одного чата выполняются
+        #  по очереди, блокировка удаляется вместе с последним ожидающим
+        chat_lock = self.chat_locks.get(chat_id)
+        if chat_lock is None:
+            chat_lock = self.chat_locks[chat_id] = ChatLock()
+        chat_lock.users += 1
+        metrics = self.store.bot_metrics
+        try:
+            if chat_lock.lock.locked():
+                labeled(metrics.CHAT_LOCK_CONTENDED, source).inc()
+            start = time.perf_counter()
+            async with chat_lock.lock:
+                labeled(metrics.CHAT_LOCK_WAIT, source).observe(
+                    time.perf_counter() - start
+                )
+                yield
+        finally:
+            chat_lock.users -= 1
+            if chat_lock.users == 0:
+                del self.chat_locks[chat_id]
+
+    async def run_timeout(self, fsm: Fsm, on_timeout: TimeoutCallback) -> None:
+        async with self.chat_lock(fsm.chat_id, "timer"):
+            # TODO: Пока ждали блокировку, обновление могло сменить
+            #  состояние, перезапустить таймер или завершить игру
+            if (
+                self.fsm_storage.get(fsm.chat_id) is not fsm
+                or not fsm.timer_manager.take_expired()
+            ):
+                self.store.bot_metrics.STALE_TIMEOUTS.inc()
+                return
+            self.store.bot_metrics.TIMEOUTS.labels(fsm.game.state.name).inc()
+            fsm.record_event(
+                GameEventType.TIMEOUT,
+                fsm.game.current_player,
+                state=fsm.game.state.name,
+            )
+            await on_timeout()
+
+    def count_games(self) -> int:
+        # TODO: Выгруженные из памяти игры тоже не завершены, завершенные
+        #  без FSM удаляет prune_evicted
+        return len(self.fsm_storage) + len(self.evicted)
+
+    def count_players(self) -> int:
+        # TODO: Игроки, которые еще ходят, в играх в памяти
+        return sum(
+            len(fsm.game.turn_ring)
+            for fsm in list(self.fsm_storage.values())
+            if fsm.game is not None
+        )
 
     def get_fsm(self, chat_id: int) -> Fsm | None:
-        return self.fsm_storage.get(chat_id)
+        fsm = self.fsm_storage.get(chat_id)
+        if fsm is not None:
+            fsm.last_active = time.monotonic()
+        return fsm
 
-    @increment_active_games
     def set_fsm(self, chat_id: int, game_id: int) -> Fsm:
+        self.evicted.pop(chat_id)
         fsm = setup_fsm(self.store, chat_id, game_id)
         self.fsm_storage[chat_id] = fsm
         return fsm
 
-    @decrement_active_games
+    async def rehydrate(self, chat_id: int) -> Fsm | None:
+        # TODO: Выгруженная игра поднимается из БД при следующем обновлении
+        game_id = self.evicted.pop(chat_id)
+        if game_id is None or chat_id in self.fsm_storage:
+            return self.get_fsm(chat_id)
+        game = await self.store.game_accessor.get_game_with_players(game_id)
+        if game is None or game.state == GameState.GAME_FINISHED:
+            return None
+        question = await self.store.question_cache.get(game.question_id)
+        fsm = self.set_fsm(chat_id, game_id)
+        fsm.init_game(game, question, game.game_participants)
+        await fsm.resume()
+        self.store.bot_metrics.FSM_REHYDRATIONS.inc()
+        return fsm
+
     def remove_fsm(self, chat_id: int) -> None:
         if chat_id in self.fsm_storage:
             del self.fsm_storage[chat_id]
+
+    async def restore_games(self, owns_chat: Callable[[int], bool]) -> int:
+        start = time.perf_counter()
+        live_games = await self.store.game_accessor.get_live_games()
+        restored = await self._resume_games(live_games, owns_chat)
+        duration = time.perf_counter() - start
+        self.store.bot_metrics.RESTORE_DURATION.set(duration)
+        self.store.bot_metrics.RESTORED_GAMES.set(restored)
+        logger.info("Restored %s games in %.3fs", restored, duration)
+        return restored
+
+    def watch_deadlines(self, owns_chat: Callable[[int], bool]) -> None:
+        self.deadline_task = asyncio.create_task(self._deadline_loop(owns_chat))
+
+    async def _deadline_loop(self, owns_chat: Callable[[int], bool]) -> None:
+        while True:
+            await asyncio.sleep(self.store.config.game.deadline_scan_interval)
+            try:
+                resumed = await self.resume_expired(owns_chat)
+            except SQLAlchemyError as e:
+                logger.error("Failed to scan expired deadlines: %s", e)
+                continue
+            if resumed:
+                self.store.bot_metrics.OVERDUE_GAMES.inc(resumed)
+                logger.info("Resumed %s games with expired deadline", resumed)
+
+    async def resume_expired(self, owns_chat: Callable[[int], bool]) -> int:
+        # TODO: Игры без FSM в памяти, чей таймер уже должен был сработать.
+        #  Просроченные игры других ботов и игры в памяти тоже попадают
+        #  в выборку, поэтому читаем страницами до конца
+        resumed = 0
+        after = None
+        while True:
+            expired = await self.store.game_accessor.get_expired_games(
+                after, DEADLINE_SCAN_BATCH_SIZE
+            )
+            if not expired:
+                return resumed
+            resumed += await self._resume_games(
+                [(game_id, chat_id) for game_id, chat_id, _ in expired],
+                owns_chat,
+            )
+            if len(expired) < DEADLINE_SCAN_BATCH_SIZE:
+                return resumed
+            game_id, _, deadline_at = expired[-1]
+            after = (deadline_at, game_id)
+
+    async def _resume_games(
+        self,
+        games: Sequence[tuple[int, int]],
+        owns_chat: Callable[[int], bool],
+    ) -> int:
+        game_ids = [
+            game_id
+            for game_id, chat_id in games
+            if owns_chat(chat_id) and chat_id not in self.fsm_storage
+        ]
+        resumed = 0
+        for batch in batched(game_ids, RESTORE_BATCH_SIZE):
+            models = await self.store.game_accessor.get_games_with_players(
+                batch
+            )
+            questions = await self.store.question_cache.get_many(
+                {game.question_id for game in models}
+            )
+            for game in models:
+                async with self.chat_lock(game.chat_id, "resume"):
+                    # TODO: Пока шла загрузка, в чате могли начать игру заново
+                    if game.chat_id in self.fsm_storage:
+                        continue
+                    fsm = self.set_fsm(game.chat_id, game.game_id)
+                    fsm.init_game(
+                        game,
+                        questions[game.question_id],
+                        game.game_participants,
+                    )
+                    try:
+                        await fsm.resume()
+                    except AppError as e:
+                        logger.error(
+                            "Failed to resume game_id: %s, %s", game.game_id, e
+                        )
+                        continue
+                    resumed += 1
+        return resumed
+
+    async def evict_idle(self) -> None:
+        config = self.store.config.game
+        idle_since = time.monotonic() - config.fsm_idle_timeout
+        by_activity = sorted(
+            self.fsm_storage.values(), key=lambda fsm: fsm.last_active
+        )
+        over_capacity = len(by_activity) - config.max_resident_games
+        for fsm in by_activity:
+            if fsm.last_active < idle_since:
+                reason = "idle"
+            elif over_capacity > 0:
+                reason = "capacity"
+            else:
+                break
+            if await self._evict(fsm, reason):
+                over_capacity -= 1
+
+    async def _evict(self, fsm: Fsm, reason: str) -> bool:
+        async with self.chat_lock(fsm.chat_id, "eviction"):
+            return await self._evict_locked(fsm, reason)
+
+    async def _evict_locked(self, fsm: Fsm, reason: str) -> bool:
+        # TODO: Сработавший таймер ждет блокировку чата, игра остается
+        #  в памяти до его обработки
+        if fsm.timer_manager.is_expired:
+            return False
+        last_active = fsm.last_active
+        try:
+            await fsm.flush()
+        except UpdateGameStateError as e:
+            logger.error(e)
+            return False
+        # TODO: Пока шел сброс, игра могла получить обновление
+        if (
+            fsm.last_active != last_active
+            or fsm.timer_manager.is_expired
+            or self.fsm_storage.get(fsm.chat_id) is not fsm
+        ):
+            return False
+        # TODO: Срок таймера уже в БД, таймер снова ставится из deadline_at
+        #  при подъеме игры обновлением или сканированием сроков
+        fsm.timer_manager.cancel()
+        del self.fsm_storage[fsm.chat_id]
+        self.evicted.put(fsm.chat_id, fsm.game_id)
+        self.store.bot_metrics.FSM_EVICTIONS.labels(reason).inc()
+        return True
+
+    async def prune_evicted(self) -> int:
+        # TODO: Выгруженную игру могли завершить без FSM этого бота,
+        #  например после смены владельца чата
+        pruned = 0
+        for batch in batched(self.evicted.items(), RESTORE_BATCH_SIZE):
+            live = await self.store.game_accessor.get_live_game_ids(
+                [game_id for _, game_id in batch]
+            )
+            for chat_id, game_id in batch:
+                # TODO: Пока шел запрос, игру могли поднять или выгрузить новую
+                if game_id not in live and self.evicted.get(chat_id) == game_id:
+                    self.evicted.pop(chat_id)
+                    pruned += 1
+        return pruned
+
+    async def _eviction_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.store.config.game.eviction_interval)
+            await self.evict_idle()
+            try:
+                await self.prune_evicted()
+            except SQLAlchemyError as e:
+                logger.error("Failed to prune evicted games: %s", e)
+
+    async def flush_all(self) -> None:
+        for fsm in list(self.fsm_storage.values()):
+            try:
+                await fsm.flush()
+            except UpdateGameStateError as e:
+                logger.error(e)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.store.config.game.flush_interval)
+            await self.flush_all()
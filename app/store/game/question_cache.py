@@ -0,0 +1,85 @@
+import logging
+import typing
+from collections.abc import Iterable
+
+from app.game.models import QuestionModel
+from app.store.cache import LRUCache
+
+if typing.TYPE_CHECKING:
+    from app.store.store import Store
+
+QUESTIONS_CHANNEL = "questions_changed"
+logger = logging.getLogger(__name__)
+
+
+class QuestionCache:
+    def __init__(self, store: "Store") -> None:
+        self.store = store
+        self._questions: LRUCache[int, QuestionModel] = LRUCache(
+            store.config.game.question_cache_size
+        )
+
+    async def connect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        await self.store.database.add_listener(
+            QUESTIONS_CHANNEL, self._on_notify, self._on_reconnect
+        )
+        logger.info("Question cache subscribed to %s", QUESTIONS_CHANNEL)
+
+    async def get(self, question_id: int) -> QuestionModel:
+        question = self._questions.get(question_id)
+        if question is not None:
+            self.store.bot_metrics.QUESTION_CACHE_HITS.inc()
+            return question
+
+        self.store.bot_metrics.QUESTION_CACHE_MISSES.inc()
+        question = await self.store.game_accessor.get_question_by_id(
+            question_id
+        )
+        self.put(question)
+        return question
+
+    async def get_many(
+        self, question_ids: Iterable[int]
+    ) -> dict[int, QuestionModel]:
+        questions = {}
+        missing = []
+        for question_id in question_ids:
+            question = self._questions.get(question_id)
+            if question is None:
+                missing.append(question_id)
+            else:
+                questions[question_id] = question
+        self.store.bot_metrics.QUESTION_CACHE_HITS.inc(len(questions))
+        if missing:
+            self.store.bot_metrics.QUESTION_CACHE_MISSES.inc(len(missing))
+            for question in await self.store.game_accessor.get_questions_by_ids(
+                missing
+            ):
+                self.put(question)
+                questions[question.question_id] = question
+        return questions
+
+    def put(self, question: QuestionModel) -> None:
+        self._questions.put(question.question_id, question)
+
+    def invalidate(self, question_id: int | None = None) -> None:
+        if question_id is None:
+            self._questions.clear()
+        else:
+            self._questions.pop(question_id)
+
+    def _on_notify(
+        self,
+        connection: typing.Any,
+        pid: int,
+        channel: str,
+        payload: str,
+    ) -> None:
+        # TODO: Пустой payload - сбрасываем весь кэш
+        self.invalidate(int(payload) if payload else None)
+        logger.info("Question cache invalidated: question_id=%s", payload)
+
+    def _on_reconnect(self) -> None:
+        # TODO: Уведомления за время разрыва потеряны, кэш мог устареть
+        self.invalidate()
+        logger.info("Question cache cleared after LISTEN reconnect")
@@ -4,13 +4,18 @@ from app.web.config import Config
 class Store:
     def __init__(self, config: Config) -> None:
         from app.bot.metrics import MetricsBot
+        from app.game.timer import TimingWheel
         from app.store.admin.accessor import AdminAccessor
         from app.store.bot.manager import setup_bot_manager
         from app.store.broker.rabbitmq_broker import RabbitMQClient
         from app.store.database.database import Database
         from app.store.game.accessor import GameAccessor
+        from app.store.game.archiver import GameArchiver
+        from app.store.game.event_log import GameEventLog
         from app.store.game.fsm_manager import FsmManager
+        from app.store.game.question_cache import QuestionCache
         from app.store.tg_api.accessor import TGApiAccessor
+        from app.store.tracing.tracer import Tracer
 
         self.config = config
         self.admin_accessor = AdminAccessor(self)
@@ -18,7 +23,12 @@ class Store:
         self.broker = RabbitMQClient(self)
         self.database = Database(self)
         self.game_accessor = GameAccessor(self)
+        self.game_archiver = GameArchiver(self)
+        self.game_event_log = GameEventLog(self)
         self.fsm_manager = FsmManager(self)
+        self.question_cache = QuestionCache(self)
         self.tg_api = TGApiAccessor(self)
+        self.timing_wheel = TimingWheel(self)
+        self.tracer = Tracer(self)
 
         self.bot_metrics = MetricsBot(self)
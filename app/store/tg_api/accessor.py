@@ -1,4 +1,5 @@
 import logging
+import time
 import typing
 
 from aiohttp import ClientConnectionError, ClientResponseError, TCPConnector
@@ -25,17 +26,25 @@ class TGApiAccessor:
             logger.info("Session closed")
 
     async def _request_api(self, method: str, params: dict) -> dict:
+        start = time.perf_counter()
         try:
             url = f"{API_PATH}{self.store.config.bot.token}/{method}"
-            async with self.session.post(url=url, json=params) as response:
-                response.raise_for_status()
-                return await response.json()
+            with self.store.tracer.span(f"tg_api.{method}"):
+                async with self.session.post(url=url, json=params) as response:
+                    response.raise_for_status()
+                    return await response.json()
         except ClientConnectionError as e:
             logger.error(e)
+            self.store.bot_metrics.TG_API_ERRORS.labels(method).inc()
             raise
         except ClientResponseError as e:
             logger.error(e)
+            self.store.bot_metrics.TG_API_ERRORS.labels(method).inc()
             raise
+        finally:
+            self.store.bot_metrics.TG_API_LATENCY.labels(method).observe(
+                time.perf_counter() - start
+            )
 
     async def fetch_updates(self, offset: int | None, timeout_: int) -> dict:
         params = {
@@ -0,0 +1,53 @@
+import json
+import typing
+from collections.abc import Sequence
+from pathlib import Path
+
+if typing.TYPE_CHECKING:
+    from app.store.tracing.tracer import Span
+
+
+class SpanExporter(typing.Protocol):
+    def export(self, spans: Sequence["Span"]) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class InMemorySpanExporter:
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, spans: Sequence["Span"]) -> None:
+        self.spans.extend(spans)
+
+    def shutdown(self) -> None:
+        pass
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class FileSpanExporter:
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = self.path.open("a", encoding="utf-8")
+
+    def export(self, spans: Sequence["Span"]) -> None:
+        # TODO: Одна строка JSON на спан
+        self.file.writelines(
+            json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n"
+            for span in spans
+        )
+        self.file.flush()
+
+    def shutdown(self) -> None:
+        self.file.close()
+
+
+class NoopSpanExporter:
+    def export(self, spans: Sequence["Span"]) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
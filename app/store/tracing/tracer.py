@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import random
+import secrets
+import time
+import typing
+from collections.abc import Generator, Mapping, MutableMapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from app.store.tracing.exporters import (
+    FileSpanExporter,
+    InMemorySpanExporter,
+    NoopSpanExporter,
+    SpanExporter,
+)
+
+if typing.TYPE_CHECKING:
+    from app.store.store import Store
+    from app.web.config import TracingConfig
+
+logger = logging.getLogger(__name__)
+
+# Заголовок W3C Trace Context: 00-<trace_id>-<span_id>-<flags>
+TRACEPARENT = "traceparent"
+SAMPLED_FLAG = 0x01
+
+
+@dataclass(slots=True, frozen=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+    def to_traceparent(self) -> str:
+        flags = SAMPLED_FLAG if self.sampled else 0
+        return f"00-{self.trace_id}-{self.span_id}-{flags:02x}"
+
+    @classmethod
+    def from_traceparent(cls, value: str) -> "SpanContext | None":
+        parts = value.split("-")
+        if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+            return None
+        try:
+            flags = int(parts[3], 16)
+        except ValueError:
+            return None
+        return cls(parts[1], parts[2], bool(flags & SAMPLED_FLAG))
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    context: SpanContext
+    parent_id: str | None
+    start_time: float
+    end_time: float | None = None
+    attributes: dict[str, typing.Any] = field(default_factory=dict)
+    error: str | None = None
+
+    def set_attribute(self, key: str, value: typing.Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict[str, typing.Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+# Текущий спан обновления. Спан без выборки не создается, в контексте
+# хранится только SpanContext, чтобы передать решение дальше по цепочке
+CURRENT_SPAN: ContextVar[Span | SpanContext | None] = ContextVar(
+    "current_span", default=None
+)
+
+EXPORTERS: dict[str, typing.Callable[["TracingConfig"], SpanExporter]] = {
+    "file": lambda config: FileSpanExporter(config.path),
+    "memory": lambda config: InMemorySpanExporter(),
+    "none": lambda config: NoopSpanExporter(),
+}
+
+
+class Tracer:
+    def __init__(self, store: "Store") -> None:
+        self.store = store
+        self.exporter: SpanExporter | None = None
+        self.pending: list[Span] = []
+        self.task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        config = self.store.config.tracing
+        return config is not None and config.enabled
+
+    async def connect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        config = self.store.config.tracing
+        if config is None or not config.enabled:
+            return
+        # TODO: Экспортер можно подменить до connect, например в тестах
+        if self.exporter is None:
+            self.exporter = EXPORTERS[config.exporter](config)
+        self.task = asyncio.create_task(self._flush_loop())
+
+    async def disconnect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        await self.flush()
+        if self.exporter is not None:
+            self.exporter.shutdown()
+            self.exporter = None
+
+    @contextmanager
+    def start_trace(
+        self,
+        name: str,
+        parent: SpanContext | None = None,
+        **attributes: typing.Any,
+    ) -> Generator[Span | None]:
+        # TODO: Корень трассы в поллере или продолжение в боте. Решение
+        #  о выборке принимается один раз и приходит вместе с заголовком
+        if not self.enabled:
+            yield None
+            return
+        if parent is None:
+            sampled = random.random() < self.store.config.tracing.sample_rate
+            parent = SpanContext(new_trace_id(), new_span_id(), sampled)
+            parent_id = None
+        else:
+            parent_id = parent.span_id
+        if not parent.sampled:
+            token = CURRENT_SPAN.set(parent)
+            try:
+                yield None
+            finally:
+                CURRENT_SPAN.reset(token)
+            return
+        with self._run_span(
+            name, parent.trace_id, parent_id, attributes
+        ) as span:
+            yield span
+
+    @contextmanager
+    def span(
+        self, name: str, **attributes: typing.Any
+    ) -> Generator[Span | None]:
+        # TODO: Дочерние спаны только внутри трассы с выборкой
+        parent = CURRENT_SPAN.get()
+        if not isinstance(parent, Span):
+            yield None
+            return
+        with self._run_span(
+            name, parent.context.trace_id, parent.context.span_id, attributes
+        ) as span:
+            yield span
+
+    @contextmanager
+    def _run_span(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: str | None,
+        attributes: dict[str, typing.Any],
+    ) -> Generator[Span]:
+        span = Span(
+            name,
+            SpanContext(trace_id, new_span_id(), sampled=True),
+            parent_id,
+            time.time(),
+            attributes=attributes,
+        )
+        token = CURRENT_SPAN.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            CURRENT_SPAN.reset(token)
+            span.end_time = time.time()
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        self.pending.append(span)
+        dropped = len(self.pending) - self.store.config.tracing.max_pending
+        if dropped > 0:
+            del self.pending[:dropped]
+            logger.warning("Dropped %s spans", dropped)
+
+    @staticmethod
+    def inject(headers: MutableMapping[str, typing.Any]) -> None:
+        current = CURRENT_SPAN.get()
+        if isinstance(current, Span):
+            current = current.context
+        if current is not None:
+            headers[TRACEPARENT] = current.to_traceparent()
+
+    @staticmethod
+    def extract(headers: Mapping[str, typing.Any] | None) -> SpanContext | None:
+        value = headers.get(TRACEPARENT) if headers else None
+        if isinstance(value, bytes):
+            value = value.decode()
+        return SpanContext.from_traceparent(value) if value else None
+
+    async def flush(self) -> None:
+        if not self.pending or self.exporter is None:
+            return
+        spans, self.pending = self.pending, []
+        # TODO: Запись экспортера не должна блокировать цикл событий
+        await asyncio.to_thread(self.exporter.export, spans)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.store.config.tracing.flush_interval)
+            try:
+                await self.flush()
+            except OSError as e:
+                logger.error("Failed to export spans: %s", e)
+
+
+def new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+
+def new_span_id() -> str:
+    return secrets.token_hex(8)
@@ -57,6 +57,8 @@ def setup_app(config: Config) -> Application:
     )
     app.on_startup.append(store.database.connect)
     app.on_startup.append(store.admin_accessor.connect)
+    app.on_startup.append(store.game_archiver.connect)
+    app.on_cleanup.append(store.game_archiver.disconnect)
     app.on_cleanup.append(store.admin_accessor.disconnect)
     app.on_cleanup.append(store.database.disconnect)
 
@@ -64,15 +64,6 @@ class ParticipantCreateError(AppError):
         self.user_id = user_id
 
 
-class UpdateStatusPlayerError(AppError):
-    def __init__(self, player_id: int, status: str) -> None:
-        super().__init__(
-            reason=f"Player-id[{player_id}] failed to update status-[{status}]"
-        )
-        self.player_id = player_id
-        self.status = status
-
-
 class AdminCreateError(AppError):
     def __init__(self, email: str) -> None:
         super().__init__(reason=f"This email: [{email}] is already taken")
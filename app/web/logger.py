@@ -1,12 +1,137 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
 
+from app.web.config import LoggingConfig
 
-def setup_logging(level: int = logging.INFO) -> None:
-    log_format = (
-        "[%(asctime)s.%(msecs)03d] "
-        "%(module)10s:%(lineno)-4d "
-        "%(levelname)-7s - %(message)s"
-    )
-    logging.basicConfig(
-        level=level, datefmt="%Y-%m-%d %H:%M:%S", format=log_format
+# Поля контекста, которые попадают в JSON, если переданы через extra
+CONTEXT_FIELDS = (
+    "chat_id",
+    "game_id",
+    "state",
+    "phase",
+    "handler",
+    "player",
+    "command",
+)
+TEXT_FORMAT = (
+    "[%(asctime)s.%(msecs)03d] "
+    "%(module)10s:%(lineno)-4d "
+    "%(levelname)-7s - %(message)s"
+)
+# Аргументы этих типов неизменяемы и форматируются в фоновом потоке как есть
+PLAIN_ARG_TYPES = (str, int, float, bool, type(None))
+
+
+def freeze_arg(arg: object) -> object:
+    return arg if isinstance(arg, PLAIN_ARG_TYPES) else str(arg)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                payload[name] = value
+        dropped = getattr(record, "dropped", None)
+        if dropped:
+            payload["dropped"] = dropped
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    def __init__(self, rates: dict[str, float]) -> None:
+        super().__init__()
+        # TODO: Корзина токенов на логгер: rate записей в секунду,
+        #  запас на секунду всплеска
+        self.rates = rates
+        self.buckets: dict[str, list[float]] = {}
+        self.dropped: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.name)
+        if rate is None or record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.setdefault(record.name, [rate, now])
+            bucket[0] = min(bucket[0] + (now - bucket[1]) * rate, rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                self.dropped[record.name] = self.dropped.get(record.name, 0) + 1
+                return False
+            bucket[0] -= 1
+            # TODO: Число отброшенных записей уходит с первой пропущенной
+            record.dropped = self.dropped.pop(record.name, 0)
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # TODO: Сообщение и трассировку собирает форматтер в фоновом потоке.
+        #  Объекты в аргументах могут измениться или ходить в БД, поэтому
+        #  здесь они приводятся к строке
+        record = copy.copy(record)
+        if not isinstance(record.msg, str):
+            record.msg = str(record.msg)
+        if isinstance(record.args, Mapping):
+            record.args = {
+                key: freeze_arg(value) for key, value in record.args.items()
+            }
+        elif record.args:
+            record.args = tuple(freeze_arg(arg) for arg in record.args)
+        return record
+
+
+class LogListener(QueueListener):
+    def stop(self) -> None:
+        # TODO: Повторная остановка, например из atexit, ничего не делает
+        if self._thread is not None:
+            super().stop()
+
+
+def setup_logging(config: LoggingConfig | None = None) -> LogListener:
+    config = config or LoggingConfig()
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if config.format == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(
+            logging.Formatter(TEXT_FORMAT, datefmt="%Y-%m-%d %H:%M:%S")
+        )
+
+    # TODO: Цикл событий только кладет запись в очередь,
+    #  форматирование и запись в поток выполняет фоновый поток
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    if config.sampling:
+        queue_handler.addFilter(RateLimitFilter(config.sampling))
+    listener = LogListener(
+        log_queue, stream_handler, respect_handler_level=True
     )
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(config.level)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
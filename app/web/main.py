@@ -5,6 +5,6 @@ from app.web.config import get_config_path, load_config
 from app.web.logger import setup_logging
 
 if __name__ == "__main__":
-    setup_logging()
     config = load_config(get_config_path())
+    setup_logging(config.logging)
     run_app(setup_app(config))
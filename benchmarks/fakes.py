@@ -0,0 +1,224 @@
+"""Заглушки Telegram API и БД в памяти для бенчмарков FSM."""
+
+import itertools
+import typing
+from collections.abc import Iterable, Sequence
+from datetime import UTC, datetime
+
+from app.game.models import (
+    GameModel,
+    GameParticipantModel,
+    GameParticipantState,
+    GameState,
+    QuestionModel,
+    UserModel,
+)
+from app.game.snapshot import GameChanges
+from app.web.exceptions import ParticipantRegistrationError
+
+if typing.TYPE_CHECKING:
+    from app.store.game.accessor import GameAccessor
+    from app.store.store import Store
+    from app.store.tg_api.accessor import TGApiAccessor
+
+QUESTIONS = (
+    ("Колючее животное", "ёжик"),
+    ("Столица Франции", "париж"),
+    ("Самая длинная река Африки", "нил"),
+    ("Спутник Земли", "луна"),
+    ("Прибор для измерения времени", "часы"),
+    ("Птица, символ мира", "голубь"),
+    ("Жидкая вода в твердом виде", "лед"),
+    ("Русский поэт, автор Онегина", "пушкин"),
+)
+
+
+class FakeTgApi:
+    def __init__(self, store: "Store") -> None:
+        self.store = store
+        self.calls = 0
+
+    async def connect(self) -> None:
+        pass
+
+    async def disconnect(self) -> None:
+        pass
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        self.calls += 1
+
+    async def send_button_start(self, chat_id: int) -> None:
+        self.calls += 1
+
+    async def send_button_join(self, chat_id: int) -> None:
+        self.calls += 1
+
+    async def send_turn_buttons(
+        self,
+        chat_id: int,
+        username: str,
+        question: str,
+        word: str,
+        points: int,
+        bonus_points: int,
+    ) -> None:
+        self.calls += 1
+
+    async def answer_callback(
+        self, callback_id: str, text: str | None = None
+    ) -> None:
+        self.calls += 1
+
+
+class FakeGameAccessor:
+    def __init__(self, store: "Store") -> None:
+        self.store = store
+        self.calls = 0
+        self.ids = itertools.count(1)
+        self.games: dict[int, GameModel] = {}
+        # chat_id -> game_id незавершенной игры
+        self.live_games: dict[int, int] = {}
+        self.players: dict[int, GameParticipantModel] = {}
+        self.game_players: dict[int, list[GameParticipantModel]] = {}
+        self.users: dict[int, UserModel] = {}
+        self.users_by_id: dict[int, UserModel] = {}
+        self.questions = {
+            question_id: QuestionModel(
+                question_id=question_id, question=question, answer=answer
+            )
+            for question_id, (question, answer) in enumerate(QUESTIONS, 1)
+        }
+        self.question_ids = itertools.cycle(self.questions)
+        self.events = 0
+
+    async def connect(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        pass
+
+    async def get_running_game(self, chat_id: int) -> GameModel | None:
+        self.calls += 1
+        game_id = self.live_games.get(chat_id)
+        return self.games[game_id] if game_id is not None else None
+
+    async def get_random_question(self) -> QuestionModel:
+        self.calls += 1
+        return self.questions[next(self.question_ids)]
+
+    async def get_question_by_id(self, question_id: int) -> QuestionModel:
+        self.calls += 1
+        return self.questions[question_id]
+
+    async def get_questions_by_ids(
+        self, question_ids: Iterable[int]
+    ) -> list[QuestionModel]:
+        self.calls += 1
+        return [self.questions[question_id] for question_id in question_ids]
+
+    async def create_game(
+        self, chat_id: int, state: GameState, question_id: int
+    ) -> GameModel:
+        self.calls += 1
+        game = GameModel(
+            game_id=next(self.ids),
+            chat_id=chat_id,
+            state=state,
+            question_id=question_id,
+            revealed_letters="",
+            bonus_points=0,
+            participants_count=0,
+            current_player_id=None,
+        )
+        self.games[game.game_id] = game
+        self.live_games[chat_id] = game.game_id
+        self.game_players[game.game_id] = []
+        return game
+
+    async def get_game_with_players(self, game_id: int) -> GameModel:
+        self.calls += 1
+        game = self.games[game_id]
+        game.game_participants = list(self.game_players[game_id])
+        return game
+
+    async def upsert_user(
+        self,
+        tg_user_id: int,
+        username: str,
+        first_name: str | None = None,
+        last_name: str | None = None,
+    ) -> int:
+        self.calls += 1
+        user = self.users.get(tg_user_id)
+        if user is None:
+            user = UserModel(
+                user_id=next(self.ids), tg_user_id=tg_user_id, username=username
+            )
+            self.users[tg_user_id] = user
+            self.users_by_id[user.user_id] = user
+        return user.user_id
+
+    async def register_participant(
+        self, game_id: int, user_id: int
+    ) -> tuple[int, int]:
+        self.calls += 1
+        game = self.games[game_id]
+        for player in self.game_players[game_id]:
+            if player.user_id == user_id:
+                raise ParticipantRegistrationError(game_id, user_id)
+        game.participants_count += 1
+        player = GameParticipantModel(
+            participant_id=next(self.ids),
+            game_id=game_id,
+            user_id=user_id,
+            turn_order=game.participants_count - 1,
+            state=GameParticipantState.WAITING,
+            points=0,
+            user=self.users_by_id[user_id],
+        )
+        self.players[player.participant_id] = player
+        self.game_players[game_id].append(player)
+        return player.participant_id, game.participants_count
+
+    async def save_game_changes(
+        self, game_id: int, changes: GameChanges
+    ) -> tuple[str | None, dict[int, int]]:
+        self.calls += 1
+        game = self.games[game_id]
+        for name, value in changes.values.items():
+            setattr(game, name, value)
+        if changes.values.get("state") == GameState.GAME_FINISHED:
+            game.finished_at = datetime.now(UTC)
+            del self.live_games[game.chat_id]
+        game.revealed_letters += changes.letters
+        points = {}
+        for participant_id, state in changes.states.items():
+            player = self.players[participant_id]
+            player.points += changes.points.get(participant_id, 0)
+            player.state = state
+            points[participant_id] = player.points
+        return game.revealed_letters, points
+
+    async def update_status_players(
+        self,
+        game_id: int,
+        status: GameParticipantState,
+        from_statuses: Sequence[GameParticipantState],
+    ) -> int:
+        self.calls += 1
+        updated = 0
+        for player in self.game_players[game_id]:
+            if player.state in from_statuses:
+                player.state = status
+                updated += 1
+        return updated
+
+    async def add_game_events(
+        self, events: Sequence[dict[str, typing.Any]]
+    ) -> None:
+        self.calls += 1
+        self.events += len(events)
+
+
+def install_fakes(store: "Store") -> None:
+    # TODO: Заглушки повторяют только используемую часть интерфейса,
+    #  поэтому приводятся к типам Store один раз здесь
+    store.tg_api = typing.cast("TGApiAccessor", FakeTgApi(store))
+    store.game_accessor = typing.cast("GameAccessor", FakeGameAccessor(store))
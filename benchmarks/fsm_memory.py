@@ -0,0 +1,96 @@
+"""Память на одну живую игру в процессе бота.
+
+Запуск: python -m benchmarks.fsm_memory --games 10000 --players 4
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+
+from app.game.fsm import Fsm, setup_fsm
+from app.game.models import (
+    GameModel,
+    GameParticipantModel,
+    GameParticipantState,
+    GameState,
+    QuestionModel,
+    UserModel,
+)
+from app.store.store import Store
+from app.web.config import get_config_path, load_config
+
+
+async def _on_timeout() -> None:
+    pass
+
+
+def make_game(
+    game_id: int, players: int
+) -> tuple[GameModel, QuestionModel, list[GameParticipantModel]]:
+    question = QuestionModel(
+        question_id=1, question="Колючее животное", answer="ёжик"
+    )
+    game = GameModel(
+        game_id=game_id,
+        chat_id=game_id,
+        state=GameState.PLAYER_TURN,
+        question_id=question.question_id,
+        revealed_letters="",
+        bonus_points=0,
+        participants_count=players,
+        current_player_id=None,
+    )
+    participants = [
+        GameParticipantModel(
+            participant_id=game_id * players + i,
+            game_id=game_id,
+            user_id=i,
+            turn_order=i,
+            state=GameParticipantState.WAITING,
+            points=0,
+            user=UserModel(user_id=i, tg_user_id=i, username=f"user{i}"),
+        )
+        for i in range(players)
+    ]
+    return game, question, participants
+
+
+def measure(store: Store, games: int, players: int, with_game: bool) -> float:
+    models = [make_game(game_id, players) for game_id in range(games)]
+    fsms: list[Fsm] = []
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for game, question, participants in models:
+        fsm = setup_fsm(store, game.chat_id, game.game_id)
+        if with_game:
+            fsm.init_game(game, question, participants)
+        fsm.timer_manager.start(30, _on_timeout)
+        fsms.append(fsm)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    for fsm in fsms:
+        fsm.timer_manager.cancel()
+    return used / games
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--players", type=int, default=4)
+    args = parser.parse_args()
+
+    store = Store(load_config(get_config_path()))
+    fsm_only = measure(store, args.games, args.players, with_game=False)
+    live_game = measure(store, args.games, args.players, with_game=True)
+    sys.stdout.write(
+        f"games={args.games} players={args.players}\n"
+        f"fsm + timer:          {fsm_only:8.0f} bytes/game\n"
+        f"fsm + timer + game:   {live_game:8.0f} bytes/game\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
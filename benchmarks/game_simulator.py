@@ -0,0 +1,259 @@
+"""Пропускная способность FSM: сценарные игры через BotManager.handle_updates.
+
+Telegram API и БД заменены заглушками в памяти, таймеры идут
+в виртуальном времени: каждый раунд сдвигает часы колеса на --step секунд.
+
+Запуск: python -m benchmarks.game_simulator --games 2000 --players 3
+"""
+
+import argparse
+import asyncio
+import gc
+import itertools
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.game.fsm import Fsm
+from app.game.models import GameState
+from app.poller.schemes import CallbackQuery, Message, Update
+from app.store.store import Store
+from app.web.config import get_config_path, load_config
+from benchmarks.fakes import install_fakes
+
+LETTERS = "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ"
+WRONG_WORDS = ("кот", "дом", "мир", "сыр")
+
+
+@dataclass
+class VirtualClock:
+    now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@dataclass
+class SimulationResult:
+    games: int = 0
+    finished: int = 0
+    updates: int = 0
+    transitions: int = 0
+    rounds: int = 0
+    wall_time: float = 0.0
+    virtual_time: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    gc_collections: int = 0
+    peak_memory: int = 0
+
+
+class GameSimulator:
+    def __init__(
+        self, store: Store, clock: VirtualClock, args: argparse.Namespace
+    ) -> None:
+        self.store = store
+        self.clock = clock
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.update_ids = itertools.count(1)
+        self.result = SimulationResult(games=args.games)
+        # chat_id -> tg id игрока, который молчит до срабатывания таймера
+        self.idle_players: dict[int, int | None] = {}
+
+    async def handle(self, body: CallbackQuery | Message) -> None:
+        update = Update(
+            update_id=next(self.update_ids),
+            date=int(self.clock.now),
+            body=body,
+        )
+        start = time.perf_counter()
+        await self.store.bot_manager.handle_updates(update)
+        self.result.latencies.append(time.perf_counter() - start)
+        self.result.updates += 1
+
+    async def callback(self, chat_id: int, command: str, user_id: int) -> None:
+        await self.handle(
+            CallbackQuery(
+                callback_id=str(user_id),
+                chat_id=chat_id,
+                command=command,
+                message_id=1,
+                from_id=user_id,
+                from_username=f"user{user_id}",
+            )
+        )
+
+    async def message(self, chat_id: int, text: str, user_id: int) -> None:
+        await self.handle(
+            Message(
+                chat_id=chat_id,
+                text=text,
+                message_id=1,
+                from_id=user_id,
+                from_username=f"user{user_id}",
+            )
+        )
+
+    async def start_game(self, chat_id: int) -> None:
+        await self.callback(chat_id, "/start", chat_id * 100)
+        for i in range(self.args.players):
+            await self.callback(chat_id, "/join", chat_id * 100 + i)
+
+    async def play_turn(self, chat_id: int, fsm: Fsm) -> None:
+        player = fsm.current_player_tg_id
+        if (
+            fsm.current_state.enum_state != GameState.PLAYER_TURN
+            or player is None
+        ):
+            return
+        if chat_id in self.idle_players:
+            if self.idle_players[chat_id] == player:
+                return
+            del self.idle_players[chat_id]
+        roll = self.rng.random()
+        if roll < self.args.idle:
+            # TODO: Игрок молчит, ход перейдет по таймеру
+            self.idle_players[chat_id] = player
+        elif roll < self.args.idle + self.args.leave:
+            await self.callback(chat_id, "/leave_game", player)
+        elif roll < self.args.idle + self.args.leave + self.args.word:
+            await self.callback(chat_id, "/say_word", player)
+            word = (
+                fsm.game.answer
+                if self.rng.random() < 0.3
+                else self.rng.choice(WRONG_WORDS)
+            )
+            await self.message(chat_id, word, player)
+        else:
+            await self.callback(chat_id, "/say_letter", player)
+            await self.message(chat_id, self.rng.choice(LETTERS), player)
+
+    async def advance_time(self) -> None:
+        self.clock.now += self.args.step
+        wheel = self.store.timing_wheel
+        wheel.tick()
+        if wheel.callback_tasks:
+            await asyncio.gather(*wheel.callback_tasks)
+
+    async def run(self) -> SimulationResult:
+        chats = range(1, self.args.games + 1)
+        start = time.perf_counter()
+        transitions_start = count_transitions(self.store)
+        gc_start = sum(stat["collections"] for stat in gc.get_stats())
+        for chat_id in chats:
+            await self.start_game(chat_id)
+
+        fsm_manager = self.store.fsm_manager
+        live = list(chats)
+        while live and self.result.rounds < self.args.max_rounds:
+            self.result.rounds += 1
+            await asyncio.gather(
+                *(
+                    self.play_turn(chat_id, fsm)
+                    for chat_id in live
+                    if (fsm := fsm_manager.get_fsm(chat_id)) is not None
+                )
+            )
+            await self.advance_time()
+            live = [
+                chat_id
+                for chat_id in live
+                if chat_id in fsm_manager.fsm_storage
+            ]
+
+        self.result.wall_time = time.perf_counter() - start
+        self.result.virtual_time = self.clock.now
+        self.result.finished = self.args.games - len(live)
+        self.result.transitions = (
+            count_transitions(self.store) - transitions_start
+        )
+        self.result.gc_collections = (
+            sum(stat["collections"] for stat in gc.get_stats()) - gc_start
+        )
+        return self.result
+
+
+def count_transitions(store: Store) -> int:
+    return int(
+        sum(
+            sample.value
+            for metric in store.bot_metrics.TRANSITIONS.collect()
+            for sample in metric.samples
+            if sample.name.endswith("_total")
+        )
+    )
+
+
+def setup_store(clock: VirtualClock) -> Store:
+    store = Store(load_config(get_config_path()))
+    install_fakes(store)
+    store.timing_wheel.clock = clock
+    store.timing_wheel.started_at = clock()
+    return store
+
+
+def report(result: SimulationResult, store: Store) -> str:
+    latencies = sorted(result.latencies)
+    quantiles = statistics.quantiles(latencies, n=100)
+    accessor: Any = store.game_accessor
+    return (
+        f"games={result.games} finished={result.finished} "
+        f"rounds={result.rounds} virtual={result.virtual_time:.0f}s\n"
+        f"wall time:        {result.wall_time:10.3f} s\n"
+        f"updates:          {result.updates:10d} "
+        f"({result.updates / result.wall_time:,.0f}/s)\n"
+        f"transitions:      {result.transitions:10d} "
+        f"({result.transitions / result.wall_time:,.0f}/s)\n"
+        f"latency p50:      {quantiles[49] * 1e6:10.1f} us\n"
+        f"latency p99:      {quantiles[98] * 1e6:10.1f} us\n"
+        f"latency max:      {latencies[-1] * 1e6:10.1f} us\n"
+        f"db calls/update:  {accessor.calls / result.updates:10.2f}\n"
+        f"gc collections:   {result.gc_collections:10d}\n"
+        + (
+            f"peak memory:      {result.peak_memory / 1024:10.0f} KiB\n"
+            if result.peak_memory
+            else ""
+        )
+    )
+
+
+async def simulate(args: argparse.Namespace) -> None:
+    clock = VirtualClock()
+    store = setup_store(clock)
+    simulator = GameSimulator(store, clock, args)
+    await store.game_event_log.connect()
+    if args.tracemalloc:
+        tracemalloc.start()
+    result = await simulator.run()
+    if args.tracemalloc:
+        result.peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    await store.game_event_log.disconnect()
+    for fsm in store.fsm_manager.fsm_storage.values():
+        fsm.timer_manager.cancel()
+    sys.stdout.write(report(result, store))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--players", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-rounds", type=int, default=1000)
+    # Шаг виртуального времени за раунд, секунды
+    parser.add_argument("--step", type=float, default=1.0)
+    # Вероятности действий игрока в свой ход, остальное - буква
+    parser.add_argument("--idle", type=float, default=0.05)
+    parser.add_argument("--leave", type=float, default=0.02)
+    parser.add_argument("--word", type=float, default=0.1)
+    parser.add_argument("--tracemalloc", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(simulate(args))
+
+
+if __name__ == "__main__":
+    main()
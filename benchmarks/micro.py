@@ -0,0 +1,267 @@
+"""Микробенчмарки функций, которые выполняются на каждое обновление.
+
+Запуск:            python -m benchmarks.micro
+Обновить базу:     python -m benchmarks.micro --save
+Проверка в CI:     python -m benchmarks.micro --check --threshold 0.2
+
+Результаты сравниваются с benchmarks/baseline.json, снятым на той же машине.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from app.game.answer import AnswerIndex
+from app.game.messages import get_message
+from app.game.models import GameState
+from app.game.snapshot import TurnRing
+from app.poller.poller import Poller
+from app.poller.schemes import CallbackQuery, Message, Update
+from app.store.store import Store
+from app.web.config import get_config_path, load_config
+from benchmarks.fakes import install_fakes
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+REPEAT = 5
+MIN_TIME = 0.2
+
+MESSAGE_UPDATE: dict[str, Any] = {
+    "update_id": 100500,
+    "message": {
+        "message_id": 42,
+        "date": 1760000000,
+        "chat": {"id": -1001234567890, "type": "supergroup"},
+        "from": {"id": 123456789, "is_bot": False, "first_name": "Иван"},
+        "text": "ё",
+    },
+}
+CALLBACK_UPDATE: dict[str, Any] = {
+    "update_id": 100501,
+    "callback_query": {
+        "id": "4382bfdwdsb323b2d9",
+        "from": {"id": 123456789, "is_bot": False, "first_name": "Иван"},
+        "message": {
+            "message_id": 43,
+            "date": 1760000000,
+            "chat": {"id": -1001234567890, "type": "supergroup"},
+        },
+        "data": "/say_letter",
+    },
+}
+
+SyncCase = Callable[[], Any]
+AsyncCase = Callable[[], Awaitable[Any]]
+
+
+def measure(case: SyncCase) -> float:
+    # TODO: Подбираем число вызовов на MIN_TIME секунд, берем лучший повтор
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            case()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_TIME:
+            break
+        number *= 2
+    best = elapsed
+    for _ in range(REPEAT - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            case()
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e9
+
+
+async def measure_async(case: AsyncCase) -> float:
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            await case()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_TIME:
+            break
+        number *= 2
+    best = elapsed
+    for _ in range(REPEAT - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            await case()
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e9
+
+
+def sync_cases(store: Store) -> dict[str, SyncCase]:
+    poller = Poller(store)
+    update = poller._parse_update(MESSAGE_UPDATE)
+    if not isinstance(update, Update):
+        raise TypeError("MESSAGE_UPDATE is not a valid update")
+    amqp_body = poller.create_amqp_message(update).body
+    number_queues = store.config.broker.number_queues
+    answer_index = AnswerIndex.build("достопримечательность", "ОСТ")
+    turn_ring = TurnRing()
+    for participant_id in range(6):
+        turn_ring.add(participant_id)
+    return {
+        "poller_parse_message": lambda: poller._parse_update(MESSAGE_UPDATE),
+        "poller_parse_callback": lambda: poller._parse_update(CALLBACK_UPDATE),
+        "create_amqp_message": lambda: poller.create_amqp_message(update),
+        "calculate_queue_name": lambda: Poller.calculate_queue_name(
+            MESSAGE_UPDATE["message"]["chat"]["id"], number_queues
+        ),
+        # TODO: Как в Bot.process_handle_updates
+        "update_decode": lambda: Update(**json.loads(amqp_body.decode())),
+        # TODO: PlayerTurnFsmState.mask_word заменен на AnswerIndex.mask
+        "answer_index_mask": answer_index.mask,
+        # TODO: NextPlayerTurnFsmState._determine_next_player заменен
+        #  на TurnRing.next_after
+        "determine_next_player": lambda: turn_ring.next_after(2),
+        "get_message": lambda: get_message(
+            "players_connected", count=2, min_players=3
+        ),
+    }
+
+
+async def async_cases(store: Store) -> dict[str, AsyncCase]:
+    bot_manager = store.bot_manager
+    update_ids = itertools.count(1)
+
+    def make_update(body: Message | CallbackQuery) -> AsyncCase:
+        def case() -> Awaitable[None]:
+            return bot_manager.handle_updates(
+                Update(update_id=next(update_ids), date=0, body=body)
+            )
+
+        return case
+
+    # TODO: Игра в чате 1 ждет хода первого игрока
+    chat_id = 1
+    for command, user_id in (
+        ("/start", 1),
+        ("/join", 1),
+        ("/join", 2),
+        ("/join", 3),
+    ):
+        await make_update(callback(chat_id, command, user_id))()
+    fsm = store.fsm_manager.get_fsm(chat_id)
+    if fsm.current_state.enum_state != GameState.PLAYER_TURN:
+        raise RuntimeError("Game did not reach PLAYER_TURN")
+    waiting_player = next(
+        player.tg_user_id
+        for player in fsm.game.players.values()
+        if player.tg_user_id != fsm.current_player_tg_id
+    )
+    return {
+        # Сообщение в чат без игры: кнопка старта
+        "handle_message_no_game": make_update(
+            Message(
+                chat_id=2,
+                text="привет",
+                message_id=1,
+                from_id=1,
+                from_username="user1",
+            )
+        ),
+        # Кнопка не в свой ход: проверки обработчика без перехода
+        "handle_callback_not_your_turn": make_update(
+            callback(chat_id, "/say_letter", waiting_player)
+        ),
+    }
+
+
+def callback(chat_id: int, command: str, user_id: int) -> CallbackQuery:
+    return CallbackQuery(
+        callback_id=str(user_id),
+        chat_id=chat_id,
+        command=command,
+        message_id=1,
+        from_id=user_id,
+        from_username=f"user{user_id}",
+    )
+
+
+async def run(selected: list[str] | None) -> dict[str, float]:
+    store = Store(load_config(get_config_path()))
+    install_fakes(store)
+    results = {}
+    for name, case in sync_cases(store).items():
+        if not selected or name in selected:
+            results[name] = measure(case)
+    for name, async_case in (await async_cases(store)).items():
+        if not selected or name in selected:
+            results[name] = await measure_async(async_case)
+    for fsm in store.fsm_manager.fsm_storage.values():
+        fsm.timer_manager.cancel()
+    return results
+
+
+def load_baseline() -> dict[str, float]:
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text())["results"]
+
+
+def save_baseline(results: dict[str, float]) -> None:
+    baseline = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {name: round(ns, 1) for name, ns in results.items()},
+    }
+    BASELINE_PATH.write_text(
+        json.dumps(baseline, indent=2, ensure_ascii=False) + "\n"
+    )
+
+
+def report(
+    results: dict[str, float], baseline: dict[str, float], threshold: float
+) -> tuple[str, list[str]]:
+    lines = [f"{'benchmark':32} {'baseline':>12} {'current':>12} {'change':>9}"]
+    regressions = []
+    for name, ns in results.items():
+        base = baseline.get(name)
+        if base is None:
+            lines.append(f"{name:32} {'-':>12} {ns:10.0f}ns {'new':>9}")
+            continue
+        change = ns / base - 1
+        mark = ""
+        if change > threshold:
+            mark = " !"
+            regressions.append(name)
+        elif change < -threshold:
+            mark = " +"
+        lines.append(
+            f"{name:32} {base:10.0f}ns {ns:10.0f}ns {change:+8.1%}{mark}"
+        )
+    return "\n".join(lines) + "\n", regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("names", nargs="*")
+    parser.add_argument("--save", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    # Отклонение от базы, которое считается регрессией или ускорением
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.names))
+    text, regressions = report(results, load_baseline(), args.threshold)
+    sys.stdout.write(text)
+    if args.save:
+        save_baseline(results)
+        sys.stdout.write(f"baseline saved to {BASELINE_PATH}\n")
+    if args.check and regressions:
+        sys.stdout.write(f"regressions: {', '.join(regressions)}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
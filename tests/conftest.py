@@ -1 +1,84 @@
+import os
+from collections.abc import AsyncGenerator
+from pathlib import Path
 
+import asyncpg
+import pytest
+from alembic.config import Config as AlembicConfig
+from sqlalchemy import text
+
+from alembic import command
+from app.store.database.sqlalchemy_base import BaseModel
+from app.store.store import Store
+from app.web.config import Config, load_config
+
+# Тесты с БД идут в Postgres из docker-compose: docker compose up -d db
+CONFIG_PATH = Path(__file__).with_name("config.yaml")
+ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture(scope="session")
+def config() -> Config:
+    return load_config(str(CONFIG_PATH))
+
+
+@pytest.fixture(scope="session")
+async def database_url(config: Config) -> str:
+    db = config.database
+    try:
+        connection = await asyncpg.connect(
+            host=db.host,
+            port=db.port,
+            user=db.user,
+            password=db.password,
+            database="postgres",
+        )
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"Postgres is unavailable: {e}")
+    try:
+        exists = await connection.fetchval(
+            "SELECT 1 FROM pg_database WHERE datname = $1", db.database
+        )
+        if not exists:
+            await connection.execute(f'CREATE DATABASE "{db.database}"')
+    finally:
+        await connection.close()
+    return db.DATABASE_URL
+
+
+@pytest.fixture(scope="session")
+def migrated(database_url: str) -> None:
+    # TODO: Схема тестовой БД строится теми же миграциями, что и в проде
+    os.environ["CONFIG_PATH"] = str(CONFIG_PATH)
+    alembic_config = AlembicConfig(str(ROOT / "alembic.ini"))
+    alembic_config.set_main_option("script_location", str(ROOT / "alembic"))
+    command.upgrade(alembic_config, "head")
+
+
+@pytest.fixture(scope="session")
+async def store(config: Config, migrated: None) -> AsyncGenerator[Store]:
+    # TODO: Метрики регистрируются глобально, Store один на все тесты
+    store = Store(config)
+    await store.database.connect()
+    yield store
+    await store.database.disconnect()
+
+
+@pytest.fixture(autouse=True)
+async def clean_tables(request: pytest.FixtureRequest) -> AsyncGenerator[None]:
+    yield
+    if "store" not in request.fixturenames:
+        return
+    store: Store = request.getfixturevalue("store")
+    tables = ", ".join(
+        table.name for table in BaseModel.metadata.tables.values()
+    )
+    async with store.database.session_maker() as session:
+        await session.execute(
+            text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+        )
+        await session.commit()
+    # Идентификаторы начинаются заново, кэши процесса сбрасываются вместе
+    # с таблицами
+    store.game_accessor.user_ids.clear()
+    store.question_cache.invalidate()
@@ -0,0 +1,56 @@
+from app.game.answer import AnswerIndex
+
+
+def test_mask_hides_letters_and_keeps_other_characters() -> None:
+    index = AnswerIndex.build("Санкт-Петербург 2")
+
+    assert index.mask() == "_ _ _ _ _ - _ _ _ _ _ _ _ _ _   2"
+
+
+def test_reveal_opens_every_occurrence_once() -> None:
+    index = AnswerIndex.build("колокол")
+
+    assert index.reveal("о") == 3
+    assert index.mask() == "_ О _ О _ О _"
+    assert index.is_called("О")
+    # Повторно названная буква ничего не открывает
+    assert index.reveal("О") == 0
+    assert index.reveal("ы") == 0
+    assert index.is_called("ы")
+
+
+def test_yo_and_ye_are_one_letter() -> None:
+    index = AnswerIndex.build("ёлка")
+
+    assert index.reveal("е") == 1
+    # Показывается буква из ответа, а не названная
+    assert index.mask() == "Ё _ _ _"
+    assert index.reveal("ё") == 0
+    assert index.matches("елка")
+    assert index.matches("ЁЛКА")
+
+
+def test_is_guessed_after_all_letters_revealed() -> None:
+    index = AnswerIndex.build("мама")
+
+    index.reveal("м")
+    assert not index.is_guessed
+    index.reveal("а")
+    assert index.is_guessed
+    assert index.mask() == "М А М А"
+
+
+def test_build_restores_revealed_letters() -> None:
+    index = AnswerIndex.build("париж", "ПИ")
+
+    assert index.mask() == "П _ _ И _"
+    assert index.is_called("п")
+    assert not index.is_guessed
+
+
+def test_matches_ignores_case_only() -> None:
+    index = AnswerIndex.build("Париж")
+
+    assert index.matches("париж")
+    assert not index.matches("пари")
+    assert not index.matches("париж!")
@@ -0,0 +1,93 @@
+from collections.abc import AsyncGenerator
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.game.models import GameParticipantState, GameState
+from app.store.store import Store
+
+CHAT_ID = 1
+
+
+async def finish_game(
+    store: Store, winner: int, points: dict[int, int], finished_at: datetime
+) -> None:
+    accessor = store.game_accessor
+    question = await accessor.create_question(
+        f"Вопрос {winner}", f"ответ {winner}"
+    )
+    game = await accessor.create_game(
+        CHAT_ID, GameState.WAITING_FOR_PLAYERS, question.question_id
+    )
+    async with store.database.session_maker() as session:
+        for tg_user_id, user_points in points.items():
+            user_id = await accessor.upsert_user(
+                tg_user_id, f"user{tg_user_id}"
+            )
+            participant_id, _ = await accessor.register_participant(
+                game.game_id, user_id
+            )
+            state = (
+                GameParticipantState.WINNER
+                if tg_user_id == winner
+                else GameParticipantState.LOSER
+            )
+            await session.execute(
+                text(
+                    "UPDATE game_participants SET state = :state, "
+                    "points = :points WHERE participant_id = :participant_id"
+                ),
+                {
+                    "state": state.name,
+                    "points": user_points,
+                    "participant_id": participant_id,
+                },
+            )
+        await session.execute(
+            text(
+                "UPDATE games SET state = 'GAME_FINISHED', "
+                "finished_at = :finished_at WHERE game_id = :game_id"
+            ),
+            {"finished_at": finished_at, "game_id": game.game_id},
+        )
+        await session.commit()
+
+
+@pytest.fixture
+async def archive(store: Store) -> AsyncGenerator[None]:
+    yield
+    async with store.database.session_maker() as session:
+        await session.execute(
+            text("TRUNCATE games_archive, game_participants_archive")
+        )
+        await session.commit()
+
+
+async def test_leaderboard_includes_archived_games(
+    store: Store, archive: None
+) -> None:
+    now = datetime.now(UTC)
+    retention = timedelta(days=store.config.archive.retention_days)
+    await finish_game(store, 1, {1: 300, 2: 100}, now - 2 * retention)
+    await finish_game(store, 2, {1: 50, 2: 200}, now)
+    assert await store.game_archiver.archive_finished_games() == 1
+
+    leaderboard = await store.game_accessor.get_chat_leaderboard(CHAT_ID)
+
+    assert [row._asdict() for row in leaderboard] == [
+        {
+            "tg_user_id": 1,
+            "username": "user1",
+            "games": 2,
+            "wins": 1,
+            "points": 350,
+        },
+        {
+            "tg_user_id": 2,
+            "username": "user2",
+            "games": 2,
+            "wins": 1,
+            "points": 300,
+        },
+    ]
@@ -0,0 +1,64 @@
+from collections.abc import AsyncGenerator
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.game.models import GameModel, GameState
+from app.store.game import fsm_manager
+from app.store.store import Store
+
+BATCH_SIZE = 4
+FOREIGN_CHATS = range(1, 11)
+RESIDENT_CHATS = range(11, 21)
+OWN_CHATS = range(100, 103)
+
+
+@pytest.fixture
+async def overdue_games(store: Store) -> AsyncGenerator[dict[int, int]]:
+    # TODO: Самые старые сроки у игр чужих чатов и игр в памяти,
+    #  игры этого бота в конце выборки
+    question = await store.game_accessor.create_question("Вопрос", "ответ")
+    now = datetime.now(UTC)
+    chats = [*FOREIGN_CHATS, *RESIDENT_CHATS, *OWN_CHATS]
+    async with store.database.session_maker() as session:
+        game_ids = await session.scalars(
+            insert(GameModel).returning(GameModel.game_id),
+            [
+                {
+                    "chat_id": chat_id,
+                    "state": GameState.WAITING_FOR_PLAYERS,
+                    "question_id": question.question_id,
+                    "revealed_letters": "",
+                    "bonus_points": 0,
+                    "deadline_at": now - timedelta(minutes=len(chats) - i),
+                }
+                for i, chat_id in enumerate(chats)
+            ],
+        )
+        games = dict(zip(chats, game_ids, strict=True))
+        await session.commit()
+    manager = store.fsm_manager
+    for chat_id in RESIDENT_CHATS:
+        manager.set_fsm(chat_id, games[chat_id])
+    yield games
+    for fsm in manager.fsm_storage.values():
+        fsm.timer_manager.cancel()
+    manager.fsm_storage.clear()
+
+
+async def test_scan_reaches_own_games_behind_a_full_page(
+    store: Store,
+    overdue_games: dict[int, int],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(fsm_manager, "DEADLINE_SCAN_BATCH_SIZE", BATCH_SIZE)
+    manager = store.fsm_manager
+
+    resumed = await manager.resume_expired(lambda chat_id: chat_id >= 100)
+
+    assert resumed == len(OWN_CHATS)
+    for chat_id in OWN_CHATS:
+        assert manager.fsm_storage[chat_id].game_id == overdue_games[chat_id]
+    for chat_id in FOREIGN_CHATS:
+        assert chat_id not in manager.fsm_storage
@@ -0,0 +1,94 @@
+import asyncio
+from collections.abc import Sequence
+from typing import Any
+
+import pytest
+
+from app.game.models import GameEventType
+from app.store.store import Store
+from tests.utils import wait_for
+
+GAME_ID = 1
+CHAT_ID = 1
+
+
+def add_events(store: Store, count: int, start: int = 0) -> None:
+    for i in range(start, start + count):
+        store.game_event_log.add(
+            GAME_ID, CHAT_ID, GameEventType.GUESS_LETTER, letter=str(i)
+        )
+
+
+def pending_letters(store: Store) -> list[str]:
+    return [event["data"]["letter"] for event in store.game_event_log.pending]
+
+
+async def saved_letters(store: Store) -> list[str]:
+    events = await store.game_event_log.get_events(GAME_ID)
+    return [event.data["letter"] for event in events]
+
+
+def test_overflow_drops_oldest_events(
+    store: Store, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(store.config.event_log, "max_pending", 3)
+    dropped = store.bot_metrics.DROPPED_GAME_EVENTS
+    before = dropped._value.get()
+
+    add_events(store, 5)
+
+    assert pending_letters(store) == ["2", "3", "4"]
+    assert dropped._value.get() - before == 2
+    store.game_event_log.pending.clear()
+
+
+async def test_cancelled_flush_keeps_events(
+    store: Store, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    started = asyncio.Event()
+
+    async def hang(events: Sequence[dict[str, Any]]) -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(store.game_accessor, "add_game_events", hang)
+    add_events(store, 3)
+
+    # Остановка бота прерывает запись пачки
+    flush = asyncio.create_task(store.game_event_log.flush())
+    await started.wait()
+    flush.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flush
+
+    assert pending_letters(store) == ["0", "1", "2"]
+    monkeypatch.undo()
+    assert await saved_letters(store) == ["0", "1", "2"]
+
+
+async def test_flush_loop_survives_errors_and_disconnect_flushes(
+    store: Store, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    event_log = store.game_event_log
+    add_game_events = store.game_accessor.add_game_events
+    failures: list[Sequence[dict[str, Any]]] = []
+
+    async def fail_once(events: Sequence[dict[str, Any]]) -> None:
+        if not failures:
+            failures.append(events)
+            raise RuntimeError("connection reset")
+        await add_game_events(events)
+
+    monkeypatch.setattr(store.game_accessor, "add_game_events", fail_once)
+    monkeypatch.setattr(store.config.event_log, "flush_interval", 0.01)
+    await event_log.connect()
+    try:
+        add_events(store, 2)
+        await wait_for(lambda: bool(failures) and not event_log.pending)
+        assert not event_log.task.done()
+        add_events(store, 1, start=2)
+    finally:
+        await event_log.disconnect()
+
+    assert event_log.task is None
+    assert await saved_letters(store) == ["0", "1", "2"]
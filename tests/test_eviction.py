@@ -0,0 +1,110 @@
+from collections.abc import AsyncGenerator
+
+import pytest
+from sqlalchemy import update
+
+from app.game.fsm import Fsm
+from app.game.models import GameModel, GameState
+from app.store.store import Store
+
+TIMEOUT = 60
+
+
+async def on_timeout() -> None:
+    pass
+
+
+@pytest.fixture
+async def residents(store: Store) -> AsyncGenerator[list[Fsm]]:
+    # TODO: Игры ждут игроков: снимок загружен из БД, таймер в колесе
+    manager = store.fsm_manager
+    question = await store.game_accessor.create_question("Вопрос", "ответ")
+    fsms = []
+    for chat_id in range(1, 4):
+        game = await store.game_accessor.create_game(
+            chat_id, GameState.WAITING_FOR_PLAYERS, question.question_id
+        )
+        fsm = manager.set_fsm(chat_id, game.game_id)
+        await fsm.load_game()
+        fsm.current_state = fsm.states[GameState.WAITING_FOR_PLAYERS]
+        fsm.start_timer(TIMEOUT, on_timeout)
+        fsm.last_active = chat_id
+        fsms.append(fsm)
+    yield fsms
+    for fsm in [*fsms, *manager.fsm_storage.values()]:
+        fsm.timer_manager.cancel()
+    manager.fsm_storage.clear()
+    manager.evicted.clear()
+
+
+async def test_capacity_eviction_unloads_games_with_running_timer(
+    store: Store,
+    residents: list[Fsm],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(store.config.game, "max_resident_games", 1)
+    monkeypatch.setattr(store.config.game, "fsm_idle_timeout", 10**9)
+    oldest, middle, newest = residents
+
+    await store.fsm_manager.evict_idle()
+
+    assert store.fsm_manager.fsm_storage == {newest.chat_id: newest}
+    assert newest.timer_manager.is_pending
+    for fsm in (oldest, middle):
+        assert not fsm.timer_manager.is_pending
+        assert store.fsm_manager.evicted.get(fsm.chat_id) == fsm.game_id
+        # Срок таймера сохранен в БД вместе с остальными изменениями
+        game = await store.game_accessor.get_game_with_players(fsm.game_id)
+        assert game.deadline_at == fsm.game.deadline_at
+
+
+async def test_rehydrate_rearms_timer_from_deadline(
+    store: Store,
+    residents: list[Fsm],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(store.config.game, "fsm_idle_timeout", 0)
+    manager = store.fsm_manager
+    pending = store.timing_wheel.pending
+
+    await manager.evict_idle()
+
+    assert manager.fsm_storage == {}
+    assert store.timing_wheel.pending == pending - len(residents)
+
+    evicted = residents[0]
+    fsm = await manager.rehydrate(evicted.chat_id)
+
+    assert fsm is not None
+    assert fsm is not evicted
+    assert manager.fsm_storage[evicted.chat_id] is fsm
+    assert fsm.current_state is fsm.states[GameState.WAITING_FOR_PLAYERS]
+    assert fsm.game.deadline_at == evicted.game.deadline_at
+    assert fsm.timer_manager.is_pending
+    assert store.timing_wheel.pending == pending - len(residents) + 1
+
+
+async def test_finished_evicted_games_are_not_counted(
+    store: Store,
+    residents: list[Fsm],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(store.config.game, "fsm_idle_timeout", 0)
+    manager = store.fsm_manager
+    await manager.evict_idle()
+    assert manager.count_games() == len(residents)
+
+    # Игру завершили без FSM в памяти этого бота
+    finished = residents[0]
+    async with store.database.session_maker() as session:
+        await session.execute(
+            update(GameModel)
+            .where(GameModel.game_id == finished.game_id)
+            .values(state=GameState.GAME_FINISHED)
+        )
+        await session.commit()
+
+    assert await manager.prune_evicted() == 1
+    assert manager.count_games() == len(residents) - 1
+    assert manager.evicted.get(finished.chat_id) is None
+    assert await manager.prune_evicted() == 0
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.game.models import GameModel, GameParticipantState, GameState
+from app.game.snapshot import GameChanges
+from app.store.store import Store
+
+CONCURRENT_UPDATES = 100
+
+
+@pytest.fixture
+async def game(store: Store) -> GameModel:
+    accessor = store.game_accessor
+    question = await accessor.create_question("Столица Франции", "париж")
+    game = await accessor.create_game(
+        1, GameState.PLAYER_TURN, question.question_id
+    )
+    for tg_user_id in (1, 2):
+        user_id = await accessor.upsert_user(tg_user_id, f"user{tg_user_id}")
+        await accessor.register_participant(game.game_id, user_id)
+    return await accessor.get_game_with_players(game.game_id)
+
+
+async def test_concurrent_increments_are_not_lost(
+    store: Store, game: GameModel
+) -> None:
+    # TODO: Каждое изменение - дельта, одновременные UPDATE одной строки
+    #  не затирают друг друга
+    first, second = (p.participant_id for p in game.game_participants)
+
+    async def save(i: int) -> tuple[str | None, dict[int, int]]:
+        participant_id = first if i % 2 else second
+        return await store.game_accessor.save_game_changes(
+            game.game_id,
+            GameChanges(
+                values={"bonus_points": i},
+                letters="а",
+                points={participant_id: 10},
+                states={participant_id: GameParticipantState.WAITING},
+            ),
+        )
+
+    results = await asyncio.gather(
+        *(save(i) for i in range(CONCURRENT_UPDATES))
+    )
+
+    saved = await store.game_accessor.get_game_with_players(game.game_id)
+    assert saved.revealed_letters == "а" * CONCURRENT_UPDATES
+    assert {p.participant_id: p.points for p in saved.game_participants} == {
+        first: 10 * CONCURRENT_UPDATES // 2,
+        second: 10 * CONCURRENT_UPDATES // 2,
+    }
+    # RETURNING отдает значение после своего UPDATE: все промежуточные
+    # длины строки встречаются ровно по одному разу
+    assert sorted(len(letters or "") for letters, _ in results) == list(
+        range(1, CONCURRENT_UPDATES + 1)
+    )
+
+
+async def test_cached_user_skips_db_method_metric(store: Store) -> None:
+    accessor = store.game_accessor
+    latency = store.bot_metrics.DB_METHOD_LATENCY
+
+    def observed() -> float:
+        return sum(
+            sample.value
+            for metric in latency.collect()
+            for sample in metric.samples
+            if sample.name.endswith("_count")
+            and sample.labels["method"] == "GameAccessor._upsert_user"
+        )
+
+    user_id = await accessor.upsert_user(1, "user1")
+    before = observed()
+
+    assert await accessor.upsert_user(1, "user1") == user_id
+    assert observed() == before
+    await accessor.upsert_user(1, "renamed")
+    assert observed() == before + 1
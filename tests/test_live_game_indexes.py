@@ -0,0 +1,81 @@
+import json
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import event
+
+from app.game.models import GameParticipantState, GameState
+from app.store.store import Store
+
+
+async def capture_statement(
+    store: Store, call: Callable[[], Awaitable[Any]]
+) -> tuple[str, tuple]:
+    statements = []
+
+    def before_cursor_execute(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: tuple,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        statements.append((statement, parameters))
+
+    engine = store.database.engine.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        await call()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements[0]
+
+
+async def generic_plan(store: Store, statement: str, parameters: tuple) -> str:
+    # TODO: Пул asyncpg кэширует подготовленные запросы, после нескольких
+    #  выполнений Postgres переходит на generic-план без значений параметров.
+    #  Индекс должен подходить и такому плану
+    arguments = ", ".join(
+        str(value)
+        if isinstance(value, int)
+        else "'{}'".format(str(value).replace("'", "''"))
+        for value in parameters
+    )
+    async with store.database.engine.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        await conn.exec_driver_sql("SET plan_cache_mode = force_generic_plan")
+        await conn.exec_driver_sql(f"PREPARE checked AS {statement}")
+        try:
+            plan = await conn.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) EXECUTE checked({arguments})"
+            )
+            return json.dumps(plan.scalar())
+        finally:
+            await conn.exec_driver_sql("DEALLOCATE checked")
+            await conn.rollback()
+
+
+async def test_running_game_uses_live_chat_index(store: Store) -> None:
+    statement, parameters = await capture_statement(
+        store, lambda: store.game_accessor.get_running_game(1)
+    )
+    plan = await generic_plan(store, statement, parameters)
+    assert "ix_games_live_chat_id" in plan
+
+
+async def test_participant_update_uses_game_state_index(store: Store) -> None:
+    question = await store.game_accessor.create_question("Вопрос", "ответ")
+    game = await store.game_accessor.create_game(
+        1, GameState.PLAYER_TURN, question.question_id
+    )
+    statement, parameters = await capture_statement(
+        store,
+        lambda: store.game_accessor.update_status_players(
+            game.game_id,
+            GameParticipantState.LOSER,
+            (GameParticipantState.WAITING, GameParticipantState.ACTIVE_TURN),
+        ),
+    )
+    plan = await generic_plan(store, statement, parameters)
+    assert "ix_game_participants_game_id_state" in plan
@@ -0,0 +1,59 @@
+import json
+import logging
+import threading
+from collections.abc import Generator
+
+import pytest
+
+from app.web.config import LoggingConfig
+from app.web.logger import JsonFormatter, setup_logging
+
+
+class ThreadRecorder(JsonFormatter):
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads: list[threading.Thread] = []
+
+    def format(self, record: logging.LogRecord) -> str:
+        self.threads.append(threading.current_thread())
+        return super().format(record)
+
+
+@pytest.fixture
+def root_handlers() -> Generator[None]:
+    # TODO: setup_logging заменяет обработчики корня, после теста
+    #  возвращаем обработчики pytest
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_json_record_is_formatted_in_listener_thread(
+    root_handlers: None, capsys: pytest.CaptureFixture[str]
+) -> None:
+    listener = setup_logging(LoggingConfig(format="json"))
+    formatter = ThreadRecorder()
+    listener.handlers[0].setFormatter(formatter)
+    logger = logging.getLogger("app.test")
+    players = ["user1"]
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Players %s in %d", players, 1)
+    # Аргумент изменился после записи в лог
+    players.append("user2")
+    listener.stop()
+    listener.stop()
+
+    record = json.loads(capsys.readouterr().err)
+    assert record["message"] == "Players ['user1'] in 1"
+    assert record["exc_info"].startswith("Traceback")
+    assert "ValueError: boom" in record["exc_info"]
+    assert formatter.threads
+    assert threading.main_thread() not in formatter.threads
@@ -0,0 +1,49 @@
+from sqlalchemy import text
+
+from app.game.models import QuestionModel
+from app.store.game.question_cache import QUESTIONS_CHANNEL
+from app.store.store import Store
+from tests.utils import wait_for
+
+
+async def notify(store: Store, payload: str) -> None:
+    async with store.database.session_maker() as session:
+        await session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": QUESTIONS_CHANNEL, "payload": payload},
+        )
+        await session.commit()
+
+
+async def test_cache_recovers_after_listen_connection_loss(
+    store: Store,
+) -> None:
+    cache = store.question_cache
+    await cache.connect()
+    cache.put(QuestionModel(question_id=1, question="Вопрос", answer="ответ"))
+    cache.put(QuestionModel(question_id=2, question="Вопрос", answer="ответ"))
+
+    await notify(store, "1")
+    await wait_for(lambda: cache._questions.get(1) is None)
+    assert cache._questions.get(2) is not None
+
+    # Сервер рвет соединение LISTEN: бот переподключается и сбрасывает кэш
+    lost_connection = store.database.listen_connection
+    async with store.database.session_maker() as session:
+        await session.execute(
+            text("SELECT pg_terminate_backend(:pid)"),
+            {"pid": lost_connection.get_server_pid()},
+        )
+        await session.commit()
+    await wait_for(
+        lambda: (
+            store.database.listen_connection is not lost_connection
+            and not store.database.listen_lost.is_set()
+        )
+    )
+    assert len(cache._questions) == 0
+
+    # Подписка восстановлена на новом соединении
+    cache.put(QuestionModel(question_id=2, question="Вопрос", answer="ответ"))
+    await notify(store, "2")
+    await wait_for(lambda: cache._questions.get(2) is None)
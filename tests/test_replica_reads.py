@@ -0,0 +1,58 @@
+from collections.abc import AsyncGenerator
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.game.models import QuestionModel
+from app.store.store import Store
+
+
+@pytest.fixture
+async def lagging_replica(
+    store: Store, monkeypatch: pytest.MonkeyPatch
+) -> AsyncGenerator[None]:
+    # TODO: Реплика с отставанием: снимок данных зафиксирован до теста,
+    #  новые строки основного сервера ей не видны
+    engine = store.database.engine
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="REPEATABLE READ")
+        await conn.execute(text("SELECT 1"))
+        replica = async_sessionmaker(
+            bind=conn,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        monkeypatch.setattr(store.database, "healthy_replicas", [replica])
+        yield
+        await conn.rollback()
+
+
+async def test_question_cache_miss_falls_back_to_primary(
+    store: Store, lagging_replica: None
+) -> None:
+    accessor = store.game_accessor
+    question = await accessor.create_question("Вопрос", "ответ")
+
+    fetched = await accessor.get_question_by_id(question.question_id)
+    assert fetched.answer == "ответ"
+
+    fetched_many = await accessor.get_questions_by_ids([question.question_id])
+    assert [q.question_id for q in fetched_many] == [question.question_id]
+
+
+@pytest.fixture
+async def question(store: Store) -> QuestionModel:
+    return await store.game_accessor.create_question("Вопрос", "ответ")
+
+
+async def test_question_cache_miss_reads_replica(
+    store: Store, question: QuestionModel, lagging_replica: None
+) -> None:
+    # Вопрос удален на основном сервере, но реплика его еще видит
+    await store.game_accessor.delete_question_by_id(question.question_id)
+
+    fetched = await store.game_accessor.get_question_by_id(question.question_id)
+
+    assert fetched.question_id == question.question_id
@@ -0,0 +1,144 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+
+from app.game.timer import TICK, FsmTimerManager, Timer, TimingWheel
+from app.store.store import Store
+
+Fired = asyncio.Queue[int]
+
+
+class VirtualClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def set_tick(self, tick: int) -> None:
+        # Середина тика, чтобы деление на TICK не попадало на границу
+        self.now = (tick + 0.5) * TICK
+
+
+@pytest.fixture
+def clock() -> VirtualClock:
+    return VirtualClock()
+
+
+@pytest.fixture
+async def wheel(
+    store: Store, clock: VirtualClock
+) -> AsyncGenerator[TimingWheel]:
+    wheel = TimingWheel(store)
+    wheel.clock = clock
+    wheel.started_at = 0.0
+    yield wheel
+    await asyncio.gather(*wheel.callback_tasks)
+
+
+async def drain(wheel: TimingWheel, fired: Fired) -> list[int]:
+    await asyncio.gather(*wheel.callback_tasks)
+    return [fired.get_nowait() for _ in range(fired.qsize())]
+
+
+def schedule(wheel: TimingWheel, ticks: int, fired: Fired) -> Timer:
+    async def on_timeout() -> None:
+        await fired.put(ticks)
+
+    return wheel.schedule((ticks - 0.5) * TICK, on_timeout)
+
+
+def step_until_fired(
+    wheel: TimingWheel, clock: VirtualClock, timer: Timer
+) -> int:
+    while timer.slot is not None:
+        clock.set_tick(wheel.current_tick + 1)
+        wheel.tick()
+    return wheel.current_tick
+
+
+@pytest.mark.parametrize("start", [0, 100, 4000])
+@pytest.mark.parametrize(
+    "ticks", [1, 63, 64, 65, 4095, 4096, 4097, 262_143, 262_145]
+)
+async def test_timer_fires_on_its_tick(
+    wheel: TimingWheel, clock: VirtualClock, start: int, ticks: int
+) -> None:
+    # Сроки дальше 64 и 4096 тиков лежат на старших уровнях и спускаются
+    # вниз при переходе через границу уровня
+    clock.set_tick(start)
+    wheel.tick()
+    fired: Fired = asyncio.Queue()
+    timer = schedule(wheel, ticks, fired)
+
+    assert step_until_fired(wheel, clock, timer) == start + ticks
+    assert wheel.pending == 0
+    assert await drain(wheel, fired) == [ticks]
+
+
+async def test_cancelled_timer_does_not_fire(
+    wheel: TimingWheel, clock: VirtualClock
+) -> None:
+    fired: Fired = asyncio.Queue()
+    cancelled = schedule(wheel, 5000, fired)
+    kept = schedule(wheel, 5001, fired)
+    assert wheel.pending == 2
+
+    wheel.cancel(cancelled)
+    wheel.cancel(cancelled)
+
+    assert cancelled.slot is None
+    assert wheel.pending == 1
+    step_until_fired(wheel, clock, kept)
+    assert await drain(wheel, fired) == [5001]
+
+
+async def test_tick_catches_up_after_a_stall(
+    wheel: TimingWheel, clock: VirtualClock
+) -> None:
+    fired: Fired = asyncio.Queue()
+    timers = [schedule(wheel, ticks, fired) for ticks in (5000, 10, 70)]
+    late = schedule(wheel, 7000, fired)
+
+    # Цикл событий простоял 6000 тиков: один вызов догоняет их все
+    clock.set_tick(6000)
+    wheel.tick()
+
+    assert wheel.current_tick == 6000
+    assert all(timer.slot is None for timer in timers)
+    assert late.slot is not None
+    assert wheel.pending == 1
+    assert await drain(wheel, fired) == [10, 70, 5000]
+
+
+async def test_take_expired_counts_a_fired_timer_once(
+    wheel: TimingWheel, clock: VirtualClock
+) -> None:
+    async def on_timeout() -> None:
+        pass
+
+    manager = FsmTimerManager(wheel)
+    manager.start(1, on_timeout)
+    assert not manager.take_expired()
+
+    clock.set_tick(10)
+    wheel.tick()
+    assert manager.is_pending
+    assert manager.take_expired()
+    assert not manager.take_expired()
+    assert not manager.is_pending
+
+    # Таймер перезапущен после срабатывания: старое срабатывание не в счет
+    manager.start(1, on_timeout)
+    clock.set_tick(20)
+    wheel.tick()
+    manager.start(1, on_timeout)
+    assert not manager.take_expired()
+
+    # Отмененный таймер не срабатывает
+    manager.cancel()
+    clock.set_tick(30)
+    wheel.tick()
+    assert not manager.take_expired()
+    await asyncio.gather(*wheel.callback_tasks)
@@ -0,0 +1,121 @@
+import asyncio
+from collections.abc import Generator
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any, Self
+
+import aio_pika
+import pytest
+from aio_pika.abc import HeadersType
+
+from app.bot.bot import Bot
+from app.poller.poller import Poller
+from app.poller.schemes import Message, Update
+from app.store.store import Store
+from app.store.tracing.exporters import InMemorySpanExporter
+from app.store.tracing.tracer import TRACEPARENT, Span
+from app.web.config import TracingConfig
+
+CHAT_ID = 1
+
+
+class FakeResponse:
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        pass
+
+    def raise_for_status(self) -> None:
+        pass
+
+    async def json(self) -> dict[str, Any]:
+        return {"ok": True, "result": {}}
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.methods: list[str] = []
+
+    def post(self, url: str, json: dict[str, Any]) -> FakeResponse:
+        self.methods.append(url.rsplit("/", 1)[-1])
+        return FakeResponse()
+
+
+@dataclass
+class DeliveredMessage:
+    # Сообщение так, как его получает потребитель очереди
+    body: bytes
+    headers: HeadersType
+    acked: bool = field(default=False)
+
+    async def ack(self) -> None:
+        self.acked = True
+
+
+@pytest.fixture
+def exporter(
+    store: Store, monkeypatch: pytest.MonkeyPatch
+) -> Generator[InMemorySpanExporter]:
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(
+        store.config,
+        "tracing",
+        TracingConfig(enabled=True, sample_rate=1.0, exporter="memory"),
+    )
+    monkeypatch.setattr(store.tracer, "exporter", exporter)
+    monkeypatch.setattr(store.tg_api, "session", FakeSession())
+    yield exporter
+    store.tracer.pending.clear()
+
+
+async def test_trace_follows_update_from_poller_to_bot(
+    store: Store, exporter: InMemorySpanExporter
+) -> None:
+    poller = Poller(store)
+    queue: asyncio.Queue[aio_pika.Message] = asyncio.Queue()
+
+    async def add_to_queue(message: aio_pika.Message) -> None:
+        await queue.put(message)
+
+    poller.add_to_queue = add_to_queue  # type: ignore[method-assign]
+    update = Update(
+        update_id=1,
+        date=0,
+        body=Message(
+            chat_id=CHAT_ID,
+            text="привет",
+            message_id=1,
+            from_id=1,
+            from_username="user",
+        ),
+    )
+
+    await poller.publish(update)
+    published = queue.get_nowait()
+    delivered = DeliveredMessage(published.body, published.headers)
+    await Bot(store, 0).process_handle_updates(delivered)  # type: ignore[arg-type]
+    await store.tracer.flush()
+
+    assert delivered.acked
+    spans: dict[str, Span] = {span.name: span for span in exporter.spans}
+    publish = spans["poller.publish"]
+    handle = spans["bot.handle_update"]
+    (api_call,) = (
+        span for name, span in spans.items() if name.startswith("tg_api.")
+    )
+    # Заголовок несет контекст спана поллера через очередь
+    assert delivered.headers[TRACEPARENT] == publish.context.to_traceparent()
+    # Дерево: поллер -> бот -> вызов Telegram API внутри обработки
+    assert publish.parent_id is None
+    assert handle.parent_id == publish.context.span_id
+    assert api_call.parent_id == handle.context.span_id
+    assert {span.context.trace_id for span in exporter.spans} == {
+        publish.context.trace_id
+    }
+    assert handle.attributes["update_id"] == update.update_id
@@ -0,0 +1,131 @@
+import random
+from collections.abc import Sequence
+
+import pytest
+
+from app.game.fsm import Fsm, setup_fsm
+from app.game.models import GameParticipantState, GameState
+from app.game.snapshot import GameSnapshot, PlayerSnapshot, TurnRing
+from app.game.states import NextPlayerTurnFsmState
+from app.store.store import Store
+
+PLAYERS = 3
+
+
+@pytest.fixture
+def fsm(store: Store) -> Fsm:
+    # TODO: Снимок собирается в памяти, ход передается без обращений к БД
+    fsm = setup_fsm(store, 1, 1)
+    fsm.game = GameSnapshot(
+        game_id=1,
+        chat_id=1,
+        state=GameState.NEXT_PLAYER_TURN,
+        question_id=1,
+        question="Вопрос",
+        answer="ответ",
+    )
+    for participant_id in range(1, PLAYERS + 1):
+        fsm.game.add_player(
+            PlayerSnapshot(
+                participant_id=participant_id,
+                user_id=participant_id,
+                tg_user_id=participant_id,
+                username=f"user{participant_id}",
+                turn_order=participant_id,
+            )
+        )
+    return fsm
+
+
+def pass_turn(fsm: Fsm, player: PlayerSnapshot | None) -> PlayerSnapshot | None:
+    state = fsm.states[GameState.NEXT_PLAYER_TURN]
+    assert isinstance(state, NextPlayerTurnFsmState)
+    return state._pass_turn(fsm, player)
+
+
+def test_next_after_skips_removed_players() -> None:
+    ring = TurnRing()
+    for participant_id in range(1, 5):
+        ring.add(participant_id)
+
+    ring.remove(2)
+    assert ring.next_after(2) == 3
+    # Цепочка выбывших подряд приводит к первому оставшемуся
+    ring.remove(3)
+    assert ring.next_after(2) == 4
+    ring.remove(1)
+    assert ring.members() == [4]
+    assert ring.next_after(4) == 4
+    assert ring.next_after(1) == 4
+
+
+def test_empty_ring_has_no_next_player() -> None:
+    ring = TurnRing()
+    assert ring.next_after(1) is None
+
+    ring.add(1)
+    ring.remove(1)
+
+    assert len(ring) == 0
+    assert ring.members() == []
+    assert ring.next_after(1) is None
+
+
+@pytest.mark.parametrize(
+    "state", [GameParticipantState.LEFT, GameParticipantState.LOSER]
+)
+def test_turn_passes_after_current_player_drops_out(
+    fsm: Fsm, state: GameParticipantState
+) -> None:
+    game = fsm.game
+    current = game.players[2]
+    game.set_player_state(current, GameParticipantState.ACTIVE_TURN)
+    game.set_player_state(current, state)
+
+    next_player = pass_turn(fsm, current)
+
+    assert next_player is game.players[3]
+    assert next_player.state == GameParticipantState.ACTIVE_TURN
+    # Статус выбывшего не возвращается в ожидание
+    assert current.state == state
+    assert game.turn_ring.members() == [1, 3]
+
+
+def test_turn_passes_to_next_waiting_player(fsm: Fsm) -> None:
+    game = fsm.game
+    current = game.players[3]
+    game.set_player_state(current, GameParticipantState.ACTIVE_TURN)
+
+    next_player = pass_turn(fsm, current)
+
+    assert next_player is game.players[1]
+    assert current.state == GameParticipantState.WAITING
+
+
+def test_no_turn_when_everyone_dropped_out(fsm: Fsm) -> None:
+    game = fsm.game
+    for player in game.players.values():
+        game.set_player_state(player, GameParticipantState.LEFT)
+
+    assert pass_turn(fsm, game.players[1]) is None
+    assert pass_turn(fsm, None) is None
+
+
+def test_first_turn_is_picked_among_players_in_ring(
+    fsm: Fsm, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    game = fsm.game
+    game.set_player_state(game.players[3], GameParticipantState.LEFT)
+    choices: list[list[int]] = []
+
+    def choice(members: Sequence[int]) -> int:
+        choices.append(list(members))
+        return members[-1]
+
+    monkeypatch.setattr(random, "choice", choice)
+
+    first = pass_turn(fsm, None)
+
+    assert choices == [[1, 2]]
+    assert first is game.players[2]
+    assert first.state == GameParticipantState.ACTIVE_TURN
@@ -0,0 +1,10 @@
+import asyncio
+from collections.abc import Callable
+
+
+async def wait_for(condition: Callable[[], bool]) -> None:
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition is not met in 5 seconds")